@@ -4,7 +4,7 @@ Manages integrations with various platforms
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -16,9 +16,17 @@ class PlatformManager:
         self.connected_platforms = {}
         self.platform_configs = {}
         
-    def get_connected_platforms(self) -> List[str]:
-        """Get list of connected platforms"""
-        return list(self.connected_platforms.keys())
+        # Immutable snapshot of platform names, rebuilt only after a change
+        self._version = 0
+        self._snapshot_version = -1
+        self._keys_snapshot: Tuple[str, ...] = ()
+        
+    def get_connected_platforms(self) -> Tuple[str, ...]:
+        """Get connected platform names"""
+        if self._snapshot_version != self._version:
+            self._keys_snapshot = tuple(self.connected_platforms)
+            self._snapshot_version = self._version
+        return self._keys_snapshot
     
     def connect_platform(self, platform: str, config: Dict[str, Any]) -> bool:
         """Connect to a platform"""
@@ -30,6 +38,7 @@ class PlatformManager:
                 "connected_at": datetime.now().isoformat(),
                 "config": config
             }
+            self._version += 1
             
             logger.info(f"🔗 Connected to {platform}")
             return True
@@ -43,6 +52,7 @@ class PlatformManager:
         try:
             if platform in self.connected_platforms:
                 del self.connected_platforms[platform]
+                self._version += 1
                 logger.info(f"🔌 Disconnected from {platform}")
                 return True
             return False
@@ -53,16 +63,12 @@ class PlatformManager:
     
     async def send_message(self, platform: str, message: str, context: Dict[str, Any]) -> bool:
         """Send a message through a platform"""
-        try:
-            if platform not in self.connected_platforms:
-                logger.error(f"Platform {platform} not connected")
-                return False
-            
-            # This would implement actual message sending
-            # For now, just log the message
-            logger.info(f"📤 Sending message via {platform}: {message[:100]}...")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send message via {platform}: {e}")
-            return False 
\ No newline at end of file
+        if platform not in self.connected_platforms:
+            logger.error("Platform %s not connected", platform)
+            return False
+        
+        # This would implement actual message sending
+        # For now, just log the message
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📤 Sending message via %s: %s...", platform, message[:100])
+        return True 
\ No newline at end of file
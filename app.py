@@ -5,9 +5,15 @@ Your digital twin that lives on the internet while you nap in a hoodie
 """
 
 import os
+import sys
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
@@ -20,76 +26,36 @@ from personality_core.personality_engine import PersonalityEngine
 from response_engine.response_generator import ResponseGenerator
 from api.platform_integrations import PlatformManager
 from safety.safety_monitor import SafetyMonitor
-from dashboard.dashboard_routes import router as dashboard_router
+from dashboard.dashboard_routes import router as dashboard_router, set_components
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging - handlers run on a background listener thread so log
+# calls from the event loop only enqueue the record
+log_queue = queue.Queue(-1)
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler('mirrorme.log')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
+)
+log_listener.start()
+# A process can run the app lifespan more than once, so the listener is
+# flushed and stopped only at interpreter exit
+atexit.register(log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('mirrorme.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="AI Doppelgänger Engine",
-    description="Your digital twin that lives on the internet",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Global instances
-data_manager = None
-personality_engine = None
-response_generator = None
-platform_manager = None
-safety_monitor = None
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize all core components on startup"""
-    global data_manager, personality_engine, response_generator, platform_manager, safety_monitor
-    
-    logger.info("🚀 Starting AI Doppelgänger Engine...")
-    
-    try:
-        # Initialize core components
-        data_manager = DataIngestionManager()
-        personality_engine = PersonalityEngine()
-        response_generator = ResponseGenerator()
-        platform_manager = PlatformManager()
-        safety_monitor = SafetyMonitor()
-        
-        logger.info("✅ All components initialized successfully")
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize components: {e}")
-        raise
+DASHBOARD_DIST = Path("dashboard/dist")
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main dashboard"""
-    dashboard_path = Path("dashboard/dist/index.html")
-    if dashboard_path.exists():
-        return dashboard_path.read_text()
-    else:
-        return """
+FALLBACK_HTML = """
         <html>
             <head><title>AI Doppelgänger Engine</title></head>
             <body>
@@ -100,24 +66,25 @@ async def root():
         </html>
         """
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
+# How often the background task rebuilds the /health and /api/status payloads
+STATUS_REFRESH_SECONDS = 1.0
+
+def _build_status(state) -> None:
+    """Rebuild the cached /health and /api/status payloads"""
+    personality_engine = state.personality_engine
+    platform_manager = state.platform_manager
+    safety_monitor = state.safety_monitor
+    state.health_cache = {
         "status": "healthy",
         "components": {
-            "data_manager": data_manager is not None,
+            "data_manager": state.data_manager is not None,
             "personality_engine": personality_engine is not None,
-            "response_generator": response_generator is not None,
+            "response_generator": state.response_generator is not None,
             "platform_manager": platform_manager is not None,
             "safety_monitor": safety_monitor is not None
         }
     }
-
-@app.get("/api/status")
-async def get_status():
-    """Get detailed system status"""
-    return {
+    state.status_cache = {
         "system": "AI Doppelgänger Engine",
         "version": "1.0.0",
         "status": "operational",
@@ -126,12 +93,111 @@ async def get_status():
         "safety_mode": safety_monitor.get_mode() if safety_monitor else "unknown"
     }
 
+async def _refresh_status(app: FastAPI):
+    """Keep the cached status payloads fresh while the app is running"""
+    while True:
+        await asyncio.sleep(STATUS_REFRESH_SECONDS)
+        try:
+            _build_status(app.state)
+        except Exception as e:
+            logger.error(f"❌ Failed to refresh status: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize all core components on startup and release them on shutdown"""
+    logger.info("🚀 Starting AI Doppelgänger Engine...")
+    
+    try:
+        # Constructors do blocking work (NLTK downloads, disk setup), so build
+        # them concurrently off the event loop
+        (data_manager,
+         personality_engine,
+         response_generator,
+         platform_manager,
+         safety_monitor) = await asyncio.gather(
+            asyncio.to_thread(DataIngestionManager),
+            asyncio.to_thread(PersonalityEngine),
+            asyncio.to_thread(ResponseGenerator),
+            asyncio.to_thread(PlatformManager),
+            asyncio.to_thread(SafetyMonitor)
+        )
+        
+        logger.info("✅ All components initialized successfully")
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize components: {e}")
+        raise
+    
+    app.state.data_manager = data_manager
+    app.state.personality_engine = personality_engine
+    app.state.response_generator = response_generator
+    app.state.platform_manager = platform_manager
+    app.state.safety_monitor = safety_monitor
+    
+    set_components(data_manager, personality_engine, response_generator, platform_manager, safety_monitor)
+    
+    # Probes and the dashboard poll status constantly; serve a snapshot
+    _build_status(app.state)
+    status_task = asyncio.create_task(_refresh_status(app))
+    
+    yield
+    
+    logger.info("👋 Shutting down AI Doppelgänger Engine...")
+    status_task.cancel()
+    response_generator.close()
+    safety_monitor.flush()
+    set_components(None, None, None, None, None)
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="AI Doppelgänger Engine",
+    description="Your digital twin that lives on the internet",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Add CORS middleware
+# Explicit allowlists let browsers cache preflight responses (max_age)
+cors_origins = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://localhost:3000").split(",")
+    if origin.strip()
+]
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=cors_origins,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PATCH", "DELETE"],
+    allow_headers=["authorization", "content-type"],
+    max_age=86400,
+)
+
+@app.get("/health")
+async def health_check(request: Request):
+    """Health check endpoint"""
+    return request.app.state.health_cache
+
+@app.get("/api/status")
+async def get_status(request: Request):
+    """Get detailed system status"""
+    return request.app.state.status_cache
+
 # Include dashboard routes
 app.include_router(dashboard_router, prefix="/api/dashboard")
 
 # Mount static files for dashboard
-if Path("dashboard/dist").exists():
-    app.mount("/static", StaticFiles(directory="dashboard/dist"), name="static")
+if DASHBOARD_DIST.exists():
+    app.mount("/static", StaticFiles(directory=DASHBOARD_DIST), name="static")
+    # Serve the dashboard shell with ETag/304 handling; mounted last so it
+    # doesn't shadow the API routes
+    app.mount("/", StaticFiles(directory=DASHBOARD_DIST, html=True), name="spa")
+else:
+    @app.get("/", response_class=HTMLResponse)
+    async def root():
+        """Serve a placeholder until the dashboard is built"""
+        return FALLBACK_HTML
 
 if __name__ == "__main__":
     # Development server
@@ -140,5 +206,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # libuv event loop and C HTTP parser; uvloop is not available on Windows
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools"
     ) 
\ No newline at end of file
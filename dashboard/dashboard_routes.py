@@ -4,13 +4,52 @@ API endpoints for the web dashboard
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+import functools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Short-lived cache for endpoints the dashboard UI polls. Query parameters
+# come from the client, so the cache is a bounded LRU
+_RESPONSE_CACHE_SIZE = 256
+_response_cache: "OrderedDict[Tuple[str, Tuple], Tuple[float, Any]]" = OrderedDict()
+
+def cached(max_age: float):
+    """Cache a handler's result for max_age seconds, keyed by its query parameters"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            key = (func.__name__, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = _response_cache.get(key)
+            if entry is not None and entry[0] > now:
+                _response_cache.move_to_end(key)
+                return entry[1]
+            
+            result = await func(**kwargs)
+            _response_cache[key] = (now + max_age, result)
+            _response_cache.move_to_end(key)
+            
+            # Drop expired entries from the least recently used end, then
+            # enforce the size cap
+            while _response_cache:
+                expires_at = next(iter(_response_cache.values()))[0]
+                if expires_at > now and len(_response_cache) <= _RESPONSE_CACHE_SIZE:
+                    break
+                _response_cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_cache():
+    """Drop all cached responses after a state change"""
+    _response_cache.clear()
+
 # Global references to main components (set by main app)
 data_manager = None
 personality_engine = None
@@ -26,9 +65,11 @@ def set_components(dm, pe, rg, pm, sm):
     response_generator = rg
     platform_manager = pm
     safety_monitor = sm
+    invalidate_cache()
 
 # Dashboard endpoints
 @router.get("/status")
+@cached(max_age=2)
 async def get_dashboard_status():
     """Get overall system status for dashboard"""
     return {
@@ -47,6 +88,7 @@ async def get_dashboard_status():
     }
 
 @router.get("/personality")
+@cached(max_age=30)
 async def get_personality_profile():
     """Get current personality profile"""
     if not personality_engine:
@@ -66,12 +108,14 @@ async def train_personality(config: Dict[str, Any]):
     
     try:
         results = await data_manager.ingest_all_sources(config)
+        invalidate_cache()
         return {"success": True, "results": results}
     except Exception as e:
         logger.error(f"Training failed: {e}")
         raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
 
 @router.get("/stats")
+@cached(max_age=5)
 async def get_system_stats():
     """Get comprehensive system statistics"""
     stats = {
@@ -137,6 +181,7 @@ async def set_auto_reply(enabled: bool):
         raise HTTPException(status_code=503, detail="Response generator not available")
     
     response_generator.enable_auto_reply(enabled)
+    invalidate_cache()
     return {"success": True, "auto_reply_enabled": enabled}
 
 @router.post("/settings/override")
@@ -146,6 +191,7 @@ async def set_override_required(required: bool):
         raise HTTPException(status_code=503, detail="Response generator not available")
     
     response_generator.require_override(required)
+    invalidate_cache()
     return {"success": True, "override_required": required}
 
 @router.post("/settings/mood")
@@ -155,6 +201,7 @@ async def set_mood(mood: str):
         raise HTTPException(status_code=503, detail="Response generator not available")
     
     response_generator.set_mood(mood)
+    invalidate_cache()
     return {"success": True, "mood": mood}
 
 @router.post("/settings/safety-mode")
@@ -164,9 +211,11 @@ async def set_safety_mode(mode: str):
         raise HTTPException(status_code=503, detail="Safety monitor not available")
     
     safety_monitor.set_safety_mode(mode)
+    invalidate_cache()
     return {"success": True, "safety_mode": mode}
 
 @router.get("/history/responses")
+@cached(max_age=2)
 async def get_response_history(limit: int = 10):
     """Get recent response history"""
     if not response_generator:
@@ -175,6 +224,7 @@ async def get_response_history(limit: int = 10):
     return response_generator.get_recent_responses(limit)
 
 @router.get("/history/safety")
+@cached(max_age=2)
 async def get_safety_history(limit: int = 10):
     """Get recent safety events"""
     if not safety_monitor:
@@ -189,6 +239,7 @@ async def add_redline(term: str):
         raise HTTPException(status_code=503, detail="Safety monitor not available")
     
     safety_monitor.add_redline(term)
+    invalidate_cache()
     return {"success": True, "redline_added": term}
 
 @router.delete("/safety/redlines")
@@ -198,6 +249,7 @@ async def remove_redline(term: str):
         raise HTTPException(status_code=503, detail="Safety monitor not available")
     
     safety_monitor.remove_redline(term)
+    invalidate_cache()
     return {"success": True, "redline_removed": term}
 
 @router.post("/safety/sensitive-topics")
@@ -207,6 +259,7 @@ async def add_sensitive_topic(topic: str):
         raise HTTPException(status_code=503, detail="Safety monitor not available")
     
     safety_monitor.add_sensitive_topic(topic)
+    invalidate_cache()
     return {"success": True, "sensitive_topic_added": topic}
 
 @router.post("/clear/history")
@@ -215,10 +268,12 @@ async def clear_history(history_type: str):
     if history_type == "responses":
         if response_generator:
             response_generator.clear_history()
+            invalidate_cache()
             return {"success": True, "message": "Response history cleared"}
     elif history_type == "safety":
         if safety_monitor:
             safety_monitor.clear_safety_history()
+            invalidate_cache()
             return {"success": True, "message": "Safety history cleared"}
     else:
         raise HTTPException(status_code=400, detail="Invalid history type")
@@ -3,15 +3,52 @@ Discord Parser
 Extracts and processes Discord message data from exports
 """
 
-import json
+import os
+import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
+from collections import Counter
 import re
+import ijson
+import orjson
+import ciso8601
+import msgspec
 
 logger = logging.getLogger(__name__)
 
+# JSON files larger than this are streamed with ijson instead of loaded whole
+_STREAM_THRESHOLD_BYTES = 256_000_000
+
+# Above this many messages, stats are aggregated with pandas
+_VECTORIZE_THRESHOLD = 10_000
+
+# Custom Discord emojis (<:name:id>, <a:name:id>) and Unicode emoji ranges
+_DISCORD_EMOJI_RE = re.compile(
+    r'<a?:.+?:\d+>'
+    r'|[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF]'
+)
+
+# Attachment file extension -> attachment type
+_EXT_TYPE = {
+    '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.gif': 'image', '.webp': 'image',
+    '.mp4': 'video', '.mov': 'video', '.avi': 'video', '.webm': 'video',
+    '.mp3': 'audio', '.wav': 'audio', '.ogg': 'audio'
+}
+
+class ProcessedMessage(msgspec.Struct, array_like=True):
+    """A user message extracted from a Discord export"""
+    id: str
+    content: str
+    timestamp: Optional[str]
+    context: str
+    platform: str
+    channel: str
+    attachments: int
+    reactions: int
+    mentions: int
+    edited: bool
+
 class DiscordParser:
     """Parses Discord export data to extract user messages and personality traits"""
     
@@ -20,7 +57,7 @@ class DiscordParser:
         self.user_name = None
         self.processed_messages = []
         
-    async def parse_export(self, export_path: str) -> List[Dict[str, Any]]:
+    async def parse_export(self, export_path: str) -> List[ProcessedMessage]:
         """Parse Discord export directory and extract user messages"""
         export_dir = Path(export_path)
         
@@ -30,38 +67,71 @@ class DiscordParser:
         
         logger.info(f"📱 Parsing Discord export from: {export_path}")
         
-        # Find and parse messages
-        messages = []
+        # Parse message files concurrently in worker threads
+        json_paths = [p for p in export_dir.rglob("*.json") if "messages" in p.name.lower()]
+        # Also look for CSV files (alternative export format)
+        csv_paths = [p for p in export_dir.rglob("*.csv") if "messages" in p.name.lower()]
+        sources = [(self._parse_message_file_sync, p) for p in json_paths] + [(self._parse_csv_file_sync, p) for p in csv_paths]
         
-        # Look for message files in the export
-        for file_path in export_dir.rglob("*.json"):
-            if "messages" in file_path.name.lower():
-                try:
-                    file_messages = await self._parse_message_file(file_path)
-                    messages.extend(file_messages)
-                except Exception as e:
-                    logger.error(f"Failed to parse {file_path}: {e}")
+        # Bound concurrency so large exports don't thrash the disk
+        semaphore = asyncio.Semaphore((os.cpu_count() or 1) * 2)
         
-        # Also look for CSV files (alternative export format)
-        for file_path in export_dir.rglob("*.csv"):
-            if "messages" in file_path.name.lower():
-                try:
-                    file_messages = await self._parse_csv_file(file_path)
-                    messages.extend(file_messages)
-                except Exception as e:
-                    logger.error(f"Failed to parse {file_path}: {e}")
+        async def scan_file(scan, parse, file_path: Path):
+            async with semaphore:
+                return await asyncio.to_thread(lambda: scan(parse(file_path)))
+        
+        async def scan_files(scan) -> List[Any]:
+            """Reduce every export file with scan, dropping each file's messages once scanned"""
+            results = await asyncio.gather(
+                *(scan_file(scan, parse, p) for parse, p in sources),
+                return_exceptions=True
+            )
+            
+            scanned = []
+            for (_, file_path), result in zip(sources, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to parse {file_path}: {result}")
+                else:
+                    scanned.append(result)
+            return scanned
+        
+        # Identify the user
+        # This is a simplified approach - in practice, you'd need more sophisticated detection
+        if not self.user_id:
+            # Counting pass: only per-author tallies outlive each file
+            author_counts = Counter()
+            author_names = {}
+            for counts, names in await scan_files(self._count_authors):
+                author_counts.update(counts)
+                for author_id, name in names.items():
+                    author_names.setdefault(author_id, name)
+            
+            if author_counts:
+                # Assume the most frequent author is the user
+                self.user_id = author_counts.most_common(1)[0][0]
+                self.user_name = author_names[self.user_id]
+                
+                logger.info(f"👤 Identified user: {self.user_name} (ID: {self.user_id})")
         
-        # Filter for user's own messages
-        user_messages = await self._filter_user_messages(messages)
+        # Filtering pass: re-read the files, keeping only the user's messages
+        user_messages = []
+        if self.user_id:
+            for processed in await scan_files(self._select_user_messages):
+                user_messages.extend(processed)
         
         logger.info(f"📱 Found {len(user_messages)} user messages from Discord")
         return user_messages
     
-    async def _parse_message_file(self, file_path: Path) -> List[Dict[str, Any]]:
+    def _parse_message_file_sync(self, file_path: Path) -> Iterable[Dict[str, Any]]:
         """Parse a Discord message JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Files too big to hold comfortably in memory are streamed lazily,
+            # one message at a time, as the scan consumes them
+            if file_path.stat().st_size > _STREAM_THRESHOLD_BYTES:
+                return self._stream_message_file(file_path)
+            
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
             
             messages = []
             
@@ -82,84 +152,96 @@ class DiscordParser:
             logger.error(f"Failed to parse JSON file {file_path}: {e}")
             return []
     
-    async def _parse_csv_file(self, file_path: Path) -> List[Dict[str, Any]]:
-        """Parse a Discord message CSV file"""
+    def _stream_message_file(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Stream messages out of a large JSON file with ijson"""
+        with open(file_path, 'rb') as f:
+            if self._first_json_char(f) == b"[":
+                prefixes = ["item"]
+            else:
+                prefixes = ["messages.item", "channel.messages.item"]
+            
+            # Only one message dict is materialized at a time
+            for prefix in prefixes:
+                f.seek(0)
+                found = False
+                for message in ijson.items(f, prefix, use_float=True):
+                    found = True
+                    yield message
+                if found:
+                    return
+    
+    @staticmethod
+    def _first_json_char(f) -> bytes:
+        """Peek at the first significant byte of a JSON file"""
+        head = f.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+        f.seek(0)
+        return head[:1]
+    
+    def _parse_csv_file_sync(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Parse a Discord message CSV file, yielding rows as they are read"""
         try:
             import csv
             
-            messages = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+            with open(file_path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header:
+                    return
+                
+                # Resolve column positions once; missing columns point at a
+                # padding slot so they read as empty strings
+                width = len(header)
+                idx = {name: i for i, name in enumerate(header)}
+                i_id, i_ts, i_content, i_aid, i_author, i_chan = (
+                    idx.get(k, width) for k in ("ID", "Timestamp", "Content", "Author ID", "Author", "Channel ID")
+                )
+                padding = [""] * (width + 1)
+                
                 for row in reader:
-                    message = {
-                        "id": row.get("ID", ""),
-                        "timestamp": row.get("Timestamp", ""),
-                        "content": row.get("Content", ""),
+                    if len(row) <= width:
+                        row += padding[len(row):]
+                    yield {
+                        "id": row[i_id],
+                        "timestamp": row[i_ts],
+                        "content": row[i_content],
                         "author": {
-                            "id": row.get("Author ID", ""),
-                            "name": row.get("Author", "")
+                            "id": row[i_aid],
+                            "name": row[i_author]
                         },
-                        "channel_id": row.get("Channel ID", ""),
+                        "channel_id": row[i_chan],
                         "attachments": []
                     }
-                    messages.append(message)
-            
-            return messages
             
         except Exception as e:
             logger.error(f"Failed to parse CSV file {file_path}: {e}")
-            return []
     
-    async def _filter_user_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter messages to only include those from the user"""
-        user_messages = []
+    def _count_authors(self, messages: Iterable[Dict[str, Any]]) -> Tuple[Counter, Dict[str, str]]:
+        """Count messages per author, remembering the name each author first appears with"""
+        author_counts = Counter()
+        author_names = {}
         
-        # First pass: identify the user
-        if not self.user_id:
-            await self._identify_user(messages)
-        
-        # Filter messages by user
-        for msg in messages:
-            if self._is_user_message(msg):
-                processed_msg = await self._process_message(msg)
-                if processed_msg:
-                    user_messages.append(processed_msg)
-        
-        return user_messages
-    
-    async def _identify_user(self, messages: List[Dict[str, Any]]):
-        """Identify the user from the message data"""
-        # Look for patterns that indicate the user
-        # This is a simplified approach - in practice, you'd need more sophisticated detection
-        
-        # Count message frequency by author
-        author_counts = {}
         for msg in messages:
-            author_id = msg.get("author", {}).get("id", "")
-            if author_id:
-                author_counts[author_id] = author_counts.get(author_id, 0) + 1
+            author = msg.get("author") or {}
+            author_id = author.get("id")
+            if not author_id:
+                continue
+            author_counts[author_id] += 1
+            if author_id not in author_names:
+                author_names[author_id] = author.get("name", "Unknown")
         
-        # Assume the most frequent author is the user
-        if author_counts:
-            self.user_id = max(author_counts, key=author_counts.get)
-            
-            # Get the user's name
-            for msg in messages:
-                if msg.get("author", {}).get("id") == self.user_id:
-                    self.user_name = msg.get("author", {}).get("name", "Unknown")
-                    break
-            
-            logger.info(f"👤 Identified user: {self.user_name} (ID: {self.user_id})")
+        return author_counts, author_names
     
-    def _is_user_message(self, message: Dict[str, Any]) -> bool:
-        """Check if a message is from the user"""
-        if not self.user_id:
-            return False
+    def _select_user_messages(self, messages: Iterable[Dict[str, Any]]) -> List[ProcessedMessage]:
+        """Filter messages to only include those from the user"""
+        user_id = self.user_id
+        processed = (
+            self._process_message(msg) for msg in messages
+            if (msg.get("author") or {}).get("id") == user_id
+        )
         
-        author_id = message.get("author", {}).get("id", "")
-        return author_id == self.user_id
+        return [msg for msg in processed if msg]
     
-    async def _process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _process_message(self, message: Dict[str, Any]) -> Optional[ProcessedMessage]:
         """Process a single message for personality analysis"""
         try:
             content = message.get("content", "").strip()
@@ -168,15 +250,12 @@ class DiscordParser:
             if not content or content.startswith("**"):
                 return None
             
-            # Parse timestamp
+            # Parse timestamp (ciso8601 handles the trailing "Z" itself)
             timestamp = message.get("timestamp", "")
             if timestamp:
                 try:
-                    # Handle different timestamp formats
-                    if timestamp.endswith("Z"):
-                        timestamp = timestamp[:-1] + "+00:00"
-                    parsed_time = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                except:
+                    parsed_time = ciso8601.parse_datetime(timestamp)
+                except (TypeError, ValueError):
                     parsed_time = None
             else:
                 parsed_time = None
@@ -193,18 +272,18 @@ class DiscordParser:
             if attachment_text:
                 full_content += f"\n[Attachments: {attachment_text}]"
             
-            processed_message = {
-                "id": message.get("id", ""),
-                "content": full_content,
-                "timestamp": parsed_time.isoformat() if parsed_time else None,
-                "context": context,
-                "platform": "discord",
-                "channel": message.get("channel_id", ""),
-                "attachments": len(attachments),
-                "reactions": len(message.get("reactions", [])),
-                "mentions": len(message.get("mentions", [])),
-                "edited": message.get("edited", False)
-            }
+            processed_message = ProcessedMessage(
+                id=message.get("id", ""),
+                content=full_content,
+                timestamp=parsed_time.isoformat() if parsed_time else None,
+                context=context,
+                platform="discord",
+                channel=message.get("channel_id", ""),
+                attachments=len(attachments),
+                reactions=len(message.get("reactions", [])),
+                mentions=len(message.get("mentions", [])),
+                edited=message.get("edited", False)
+            )
             
             return processed_message
             
@@ -242,21 +321,15 @@ class DiscordParser:
         if not attachments:
             return ""
         
-        attachment_types = []
+        attachment_types = set()
         for attachment in attachments:
             filename = attachment.get("filename", "")
             if filename:
-                ext = Path(filename).suffix.lower()
-                if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                    attachment_types.append("image")
-                elif ext in ['.mp4', '.mov', '.avi', '.webm']:
-                    attachment_types.append("video")
-                elif ext in ['.mp3', '.wav', '.ogg']:
-                    attachment_types.append("audio")
-                else:
-                    attachment_types.append("file")
+                dot = filename.rfind(".")
+                ext = filename[dot:].lower() if dot > 0 else ""
+                attachment_types.add(_EXT_TYPE.get(ext, "file"))
         
-        return ", ".join(set(attachment_types))
+        return ", ".join(attachment_types)
     
     def get_user_info(self) -> Dict[str, str]:
         """Get identified user information"""
@@ -265,27 +338,31 @@ class DiscordParser:
             "name": self.user_name
         }
     
-    def get_message_stats(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def get_message_stats(self, messages: List[ProcessedMessage]) -> Dict[str, Any]:
         """Get statistics about the user's messages"""
         if not messages:
             return {}
         
         total_messages = len(messages)
-        total_chars = sum(len(msg.get("content", "")) for msg in messages)
-        avg_length = total_chars / total_messages if total_messages > 0 else 0
         
-        # Count emojis
-        emoji_count = 0
-        for msg in messages:
-            content = msg.get("content", "")
-            emoji_count += len(re.findall(r'<a?:.+?:\d+>', content))  # Discord emojis
-            emoji_count += len(re.findall(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF]', content))  # Unicode emojis
+        if total_messages > _VECTORIZE_THRESHOLD:
+            # Large corpora: let pandas do the per-message work in C
+            total_chars, emoji_count, contexts = self._aggregate_stats_vectorized(messages)
+        else:
+            total_chars = sum(len(msg.content) for msg in messages)
+            
+            # Count emojis
+            emoji_count = 0
+            for msg in messages:
+                emoji_count += sum(1 for _ in _DISCORD_EMOJI_RE.finditer(msg.content))
+            
+            # Context breakdown
+            contexts = {}
+            for msg in messages:
+                context = msg.context
+                contexts[context] = contexts.get(context, 0) + 1
         
-        # Context breakdown
-        contexts = {}
-        for msg in messages:
-            context = msg.get("context", "")
-            contexts[context] = contexts.get(context, 0) + 1
+        avg_length = total_chars / total_messages if total_messages > 0 else 0
         
         return {
             "total_messages": total_messages,
@@ -293,4 +370,20 @@ class DiscordParser:
             "average_length": round(avg_length, 2),
             "emoji_count": emoji_count,
             "context_breakdown": contexts
-        } 
\ No newline at end of file
+        } 
+    
+    def _aggregate_stats_vectorized(self, messages: List[ProcessedMessage]):
+        """Compute character, emoji and context totals column-wise with pandas"""
+        import pandas as pd
+        
+        df = pd.DataFrame({
+            "content": [msg.content for msg in messages],
+            "context": [msg.context for msg in messages]
+        })
+        content = df["content"].fillna("")
+        
+        total_chars = int(content.str.len().sum())
+        emoji_count = int(content.str.count(_DISCORD_EMOJI_RE.pattern).sum())
+        contexts = {context: int(count) for context, count in df["context"].fillna("").value_counts().items()}
+        
+        return total_chars, emoji_count, contexts
\ No newline at end of file
@@ -4,12 +4,13 @@ Coordinates collection and processing of user's digital footprint
 """
 
 import os
-import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple, BinaryIO
 from datetime import datetime
 import asyncio
+import numpy as np
+import msgspec
 
 from .discord_parser import DiscordParser
 from .email_loader import EmailLoader
@@ -18,6 +19,40 @@ from .text_processor import TextProcessor
 
 logger = logging.getLogger(__name__)
 
+def _encode_extra(obj: Any) -> Any:
+    """Encode values msgspec doesn't support natively (numpy scalars from the analyses)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__}")
+
+# Items handed to a worker thread per TextProcessor batch
+_PROCESS_CHUNK_SIZE = 256
+
+def _process_chunk(process: Callable[[Any], Optional[Dict[str, Any]]], chunk: List[Any]) -> List[Dict[str, Any]]:
+    """Process a batch of items, dropping the ones the processor rejects"""
+    return [processed for processed in map(process, chunk) if processed]
+
+# Processed records are streamed to disk as length-prefixed msgpack frames,
+# each a (kind, payload) pair, so they never have to be held in memory
+_FRAME_ENCODER = msgspec.msgpack.Encoder(enc_hook=_encode_extra)
+_FRAME_DECODER = msgspec.msgpack.Decoder()
+
+# Record kinds written to the processed data file
+_RECORD_KINDS = ("messages", "emails", "posts")
+
+# Shared labels for training records
+_TYPE_MESSAGE, _TYPE_EMAIL, _TYPE_POST = "message", "email", "post"
+_PLATFORM_DISCORD, _PLATFORM_EMAIL, _PLATFORM_REDDIT = "discord", "email", "reddit"
+
+def _iter_frames(filepath: Path) -> Iterator[Tuple[str, Any]]:
+    """Read (kind, payload) frames back from a processed data file"""
+    with open(filepath, 'rb') as f:
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return
+            yield _FRAME_DECODER.decode(f.read(int.from_bytes(header, 'big')))
+
 class DataIngestionManager:
     """Manages the collection and processing of user's digital footprint"""
     
@@ -31,14 +66,15 @@ class DataIngestionManager:
         self.reddit_scraper = RedditScraper()
         self.text_processor = TextProcessor()
         
-        # Data storage
+        # Data storage - processed records live in the output file; only
+        # their counts and the derived profile are kept in memory
         self.processed_data = {
-            "messages": [],
-            "emails": [],
-            "posts": [],
             "personality_traits": {},
             "style_patterns": {}
         }
+        self.record_counts = dict.fromkeys(_RECORD_KINDS, 0)
+        self.output_path: Optional[Path] = None
+        self._out: Optional[BinaryIO] = None
         
         logger.info("📥 Data Ingestion Manager initialized")
     
@@ -47,31 +83,42 @@ class DataIngestionManager:
         logger.info("🔄 Starting comprehensive data ingestion...")
         
         results = {
-            "discord": [],
-            "email": [],
-            "reddit": [],
+            "discord": 0,
+            "email": 0,
+            "reddit": 0,
             "processed": 0,
             "errors": []
         }
         
+        self._open_output()
+        
         try:
+            # Sources share no state, so ingest them concurrently
+            sources = []
+            
             # Discord data ingestion
             if config.get("discord", {}).get("enabled", False):
                 logger.info("📱 Processing Discord data...")
-                discord_data = await self.ingest_discord(config["discord"])
-                results["discord"] = discord_data
+                sources.append(("discord", self.ingest_discord(config["discord"])))
             
             # Email data ingestion
             if config.get("email", {}).get("enabled", False):
                 logger.info("📧 Processing email data...")
-                email_data = await self.ingest_email(config["email"])
-                results["email"] = email_data
+                sources.append(("email", self.ingest_email(config["email"])))
             
             # Reddit data ingestion
             if config.get("reddit", {}).get("enabled", False):
                 logger.info("🤖 Processing Reddit data...")
-                reddit_data = await self.ingest_reddit(config["reddit"])
-                results["reddit"] = reddit_data
+                sources.append(("reddit", self.ingest_reddit(config["reddit"])))
+            
+            source_results = await asyncio.gather(*(coro for _, coro in sources), return_exceptions=True)
+            for (source, _), data in zip(sources, source_results):
+                if isinstance(data, Exception):
+                    logger.error(f"❌ {source} ingestion failed: {data}")
+                    results["errors"].append(str(data))
+                else:
+                    results[source] = data
+                    results["processed"] += data
             
             # Process and analyze all collected data
             logger.info("🧠 Analyzing personality patterns...")
@@ -87,88 +134,117 @@ class DataIngestionManager:
             logger.error(f"❌ Data ingestion failed: {e}")
             results["errors"].append(str(e))
         
+        finally:
+            self._close_output()
+        
         return results
     
-    async def ingest_discord(self, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def ingest_discord(self, config: Dict[str, Any]) -> int:
         """Ingest Discord data from exports"""
         try:
             export_path = config.get("export_path")
             if not export_path or not Path(export_path).exists():
                 logger.warning("Discord export path not found")
-                return []
+                return 0
             
             messages = await self.discord_parser.parse_export(export_path)
             
             # Process messages for personality traits
-            processed_messages = []
-            for msg in messages:
-                processed = self.text_processor.process_message(msg)
-                if processed:
-                    processed_messages.append(processed)
-                    self.processed_data["messages"].append(processed)
+            processed_count = await self._process_items(messages, self.text_processor.process_message, "messages")
             
-            logger.info(f"📱 Processed {len(processed_messages)} Discord messages")
-            return processed_messages
+            logger.info(f"📱 Processed {processed_count} Discord messages")
+            return processed_count
             
         except Exception as e:
             logger.error(f"❌ Discord ingestion failed: {e}")
-            return []
+            return 0
     
-    async def ingest_email(self, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def ingest_email(self, config: Dict[str, Any]) -> int:
         """Ingest email data"""
         try:
             emails = await self.email_loader.load_emails(config)
             
             # Process emails for personality traits
-            processed_emails = []
-            for email in emails:
-                processed = self.text_processor.process_email(email)
-                if processed:
-                    processed_emails.append(processed)
-                    self.processed_data["emails"].append(processed)
+            processed_count = await self._process_items(emails, self.text_processor.process_email, "emails")
             
-            logger.info(f"📧 Processed {len(processed_emails)} emails")
-            return processed_emails
+            logger.info(f"📧 Processed {processed_count} emails")
+            return processed_count
             
         except Exception as e:
             logger.error(f"❌ Email ingestion failed: {e}")
-            return []
+            return 0
     
-    async def ingest_reddit(self, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def ingest_reddit(self, config: Dict[str, Any]) -> int:
         """Ingest Reddit data"""
         try:
             posts = await self.reddit_scraper.scrape_user_posts(config)
             
             # Process posts for personality traits
-            processed_posts = []
-            for post in posts:
-                processed = self.text_processor.process_post(post)
-                if processed:
-                    processed_posts.append(processed)
-                    self.processed_data["posts"].append(processed)
+            processed_count = await self._process_items(posts, self.text_processor.process_post, "posts")
             
-            logger.info(f"🤖 Processed {len(processed_posts)} Reddit posts")
-            return processed_posts
+            logger.info(f"🤖 Processed {processed_count} Reddit posts")
+            return processed_count
             
         except Exception as e:
             logger.error(f"❌ Reddit ingestion failed: {e}")
-            return []
+            return 0
+    
+    async def _process_items(self, items: List[Any], process: Callable[[Any], Optional[Dict[str, Any]]], kind: str) -> int:
+        """Run a TextProcessor method over items in worker-thread batches, streaming results to disk"""
+        out = self._out or self._open_output()
+        processed_count = 0
+        for start in range(0, len(items), _PROCESS_CHUNK_SIZE):
+            chunk = items[start:start + _PROCESS_CHUNK_SIZE]
+            for processed in await asyncio.to_thread(_process_chunk, process, chunk):
+                self._write_frame(out, kind, processed)
+                processed_count += 1
+        self.record_counts[kind] += processed_count
+        return processed_count
+    
+    def _open_output(self) -> BinaryIO:
+        """Start a new processed data file"""
+        self._close_output()
+        timestamp = datetime.now().isoformat()
+        self.output_path = self.data_dir / f"processed_data_{timestamp}.msgpack"
+        self.record_counts = dict.fromkeys(_RECORD_KINDS, 0)
+        self._out = open(self.output_path, 'wb')
+        return self._out
+    
+    def _close_output(self):
+        """Close the processed data file if one is open"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+    
+    def _iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream the processed records of the current data file"""
+        if self.output_path is None or not self.output_path.exists():
+            return
+        if self._out is not None:
+            self._out.flush()
+        for kind, payload in _iter_frames(self.output_path):
+            if kind in self.record_counts:
+                yield kind, payload
     
     async def analyze_personality(self) -> Dict[str, Any]:
         """Analyze collected data to extract personality traits"""
         try:
-            # Combine all text data
+            # Stream the processed records back, keeping only what the
+            # aggregation needs
             all_texts = []
-            all_texts.extend([msg["content"] for msg in self.processed_data["messages"]])
-            all_texts.extend([email["content"] for email in self.processed_data["emails"]])
-            all_texts.extend([post["content"] for post in self.processed_data["posts"]])
+            all_analyses = []
+            all_personalities = []
+            for _, record in self._iter_records():
+                all_texts.append(record["content"])
+                all_analyses.append(record.get("analysis", {}))
+                all_personalities.append(record.get("personality", {}))
             
             if not all_texts:
                 logger.warning("No text data available for personality analysis")
                 return {}
             
-            # Analyze personality traits
-            personality_traits = await self.text_processor.analyze_personality(all_texts)
+            # Analyze personality traits, reusing the analyses computed at ingest
+            personality_traits = self.text_processor.aggregate_personality(all_analyses, all_personalities)
             self.processed_data["personality_traits"] = personality_traits
             
             # Extract style patterns
@@ -188,62 +264,62 @@ class DataIngestionManager:
     async def save_processed_data(self):
         """Save processed data to disk"""
         try:
-            timestamp = datetime.now().isoformat()
-            filename = f"processed_data_{timestamp}.json"
-            filepath = self.data_dir / filename
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.processed_data, f, indent=2, ensure_ascii=False)
+            # Records were streamed as they were processed; finish the file
+            # with the derived profile
+            out = self._out or self._open_output()
+            self._write_frame(out, "profile", {
+                "personality_traits": self.processed_data["personality_traits"],
+                "style_patterns": self.processed_data["style_patterns"]
+            })
+            out.flush()
             
-            logger.info(f"💾 Processed data saved to {filepath}")
+            logger.info(f"💾 Processed data saved to {self.output_path}")
             
         except Exception as e:
             logger.error(f"❌ Failed to save processed data: {e}")
     
+    def _write_frame(self, f, kind: str, payload: Any):
+        """Append one length-prefixed msgpack frame to an open file"""
+        buf = _FRAME_ENCODER.encode((kind, payload))
+        f.write(len(buf).to_bytes(4, 'big'))
+        f.write(buf)
+    
     def get_personality_profile(self) -> Dict[str, Any]:
         """Get the current personality profile"""
         return {
             "traits": self.processed_data.get("personality_traits", {}),
             "style": self.processed_data.get("style_patterns", {}),
             "data_summary": {
-                "messages": len(self.processed_data["messages"]),
-                "emails": len(self.processed_data["emails"]),
-                "posts": len(self.processed_data["posts"])
+                "messages": self.record_counts["messages"],
+                "emails": self.record_counts["emails"],
+                "posts": self.record_counts["posts"]
             }
         }
     
-    def get_training_data(self) -> List[Dict[str, Any]]:
-        """Get processed data ready for model training"""
-        training_data = []
-        
-        # Add messages
-        for msg in self.processed_data["messages"]:
-            training_data.append({
-                "type": "message",
-                "content": msg["content"],
-                "context": msg.get("context", ""),
-                "timestamp": msg.get("timestamp"),
-                "platform": "discord"
-            })
-        
-        # Add emails
-        for email in self.processed_data["emails"]:
-            training_data.append({
-                "type": "email",
-                "content": email["content"],
-                "context": email.get("subject", ""),
-                "timestamp": email.get("timestamp"),
-                "platform": "email"
-            })
-        
-        # Add posts
-        for post in self.processed_data["posts"]:
-            training_data.append({
-                "type": "post",
-                "content": post["content"],
-                "context": post.get("subreddit", ""),
-                "timestamp": post.get("timestamp"),
-                "platform": "reddit"
-            })
-        
-        return training_data 
\ No newline at end of file
+    def get_training_data(self) -> Iterator[Dict[str, Any]]:
+        """Stream processed data ready for model training (wrap in list() if needed)"""
+        for kind, record in self._iter_records():
+            if kind == "messages":
+                yield {
+                    "type": _TYPE_MESSAGE,
+                    "content": record["content"],
+                    "context": record.get("context", ""),
+                    "timestamp": record.get("timestamp"),
+                    "platform": _PLATFORM_DISCORD
+                }
+            elif kind == "emails":
+                yield {
+                    "type": _TYPE_EMAIL,
+                    "content": record["content"],
+                    "context": record.get("subject", ""),
+                    "timestamp": record.get("timestamp"),
+                    "platform": _PLATFORM_EMAIL
+                }
+            else:
+                yield {
+                    "type": _TYPE_POST,
+                    "content": record["content"],
+                    "context": record.get("subreddit", ""),
+                    "timestamp": record.get("timestamp"),
+                    "platform": _PLATFORM_REDDIT
+                }
\ No newline at end of file
@@ -5,33 +5,139 @@ Analyzes personality traits and style patterns from text data
 
 import re
 import logging
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from statistics import fmean
+from typing import Dict, List, Optional, Any, Tuple
 from collections import Counter, defaultdict
-import emoji
-from textblob import TextBlob
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
 import numpy as np
+import msgspec
+import ahocorasick
+
+from .discord_parser import ProcessedMessage
 
 logger = logging.getLogger(__name__)
 
+# Chat exports repeat short texts ("lol", "ok") constantly; analyses are
+# memoized per text and must be treated as read-only. The caches live as
+# long as the process (a few KB per entry), so they only hold the hot set
+_ANALYSIS_CACHE_SIZE = 2_048
+
+# Patterns used on every processed text
+_RE_NONWORD = re.compile(r'[^\w\s]')
+_RE_CAPS = re.compile(r'[A-Z]')
+_RE_ALLCAPS3 = re.compile(r'[A-Z]{3,}')
+_RE_HASHTAG = re.compile(r'#\w+')
+_RE_MENTION = re.compile(r'@\w+')
+_RE_URL = re.compile(r'https?://\S+')
+_RE_WORD = re.compile(r"(?:[^\W\d_]|')+")
+_RE_SENT = re.compile(r'[.!?]+\s+')
+
+# Emoji by codepoint range: flag pairs, or a base symbol with optional
+# variation selector / skin tone, joined into ZWJ sequences
+_EMOJI_BASE = '[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF]'
+_EMOJI_MODIFIERS = '[\uFE0F\U0001F3FB-\U0001F3FF]*'
+_RE_EMOJI = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'
+    f'|{_EMOJI_BASE}{_EMOJI_MODIFIERS}(?:\u200D{_EMOJI_BASE}{_EMOJI_MODIFIERS})*'
+)
+
+# Byte classes counted in one lookup-table pass over the UTF-8 text;
+# multi-byte sequences never contain ASCII bytes, so they map to 0
+_CLASS_UPPER, _CLASS_EXCLAMATION, _CLASS_QUESTION = 1, 2, 3
+_BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+_BYTE_CLASS[ord('A'):ord('Z') + 1] = _CLASS_UPPER
+_BYTE_CLASS[ord('!')] = _CLASS_EXCLAMATION
+_BYTE_CLASS[ord('?')] = _CLASS_QUESTION
+_NUM_CLASSES = 4
+
+def _count_byte_classes(texts: List[str]) -> np.ndarray:
+    """Per-text byte class counts for a whole batch in one pass over the joined buffer"""
+    encoded = [text.encode('utf-8', 'surrogatepass') for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    classes = _BYTE_CLASS[np.frombuffer(b''.join(encoded), dtype=np.uint8)]
+    owners = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    counts = np.bincount(owners * _NUM_CLASSES + classes, minlength=len(encoded) * _NUM_CLASSES)
+    return counts.reshape(len(encoded), _NUM_CLASSES)
+
+# NLTK and TextBlob are slow to import; load them on first use so importing
+# this module stays fast
+_NLTK_READY = False
+
+def _ensure_nltk():
+    """Make sure the NLTK data the processor needs is present, once per process"""
+    global _NLTK_READY
+    if _NLTK_READY:
+        return
+    
+    import nltk
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords')
+    _NLTK_READY = True
+
+@lru_cache(maxsize=None)
+def _text_blob():
+    """The TextBlob class, imported on first use"""
+    from textblob import TextBlob
+    return TextBlob
+
+@lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)
+def _prepare_text(text: str) -> Tuple[str, Tuple[str, ...]]:
+    """Lowercased text and its word tokens, computed once per text for every analysis"""
+    text_lower = text.lower()
+    return text_lower, tuple(_RE_WORD.findall(text_lower))
+
+@lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)
+def _find_emojis(text: str) -> Tuple[str, ...]:
+    """Emojis in a text, computed once per text for all the analyses that need them"""
+    return tuple(_RE_EMOJI.findall(text))
+
+def _analyze_chunk(texts: List[str], processor: "TextProcessor") -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Analyze a batch of texts, sharing one byte-class pass across the batch"""
+    class_counts = _count_byte_classes(texts).tolist()
+    return [
+        (processor._analyze_text(text, tuple(counts)), processor._extract_personality_indicators(text))
+        for text, counts in zip(texts, class_counts)
+    ]
+
+def _style_chunk(texts: List[str]) -> Tuple[Counter, Counter, Counter]:
+    """Count words, emojis and punctuation over a batch of texts"""
+    word_freq = Counter()
+    emoji_freq = Counter()
+    punct_freq = Counter()
+    
+    for text in texts:
+        word_freq.update(w for w in _prepare_text(text)[1] if w.isalpha())
+        emoji_freq.update(_find_emojis(text))
+        punct_freq.update(_RE_NONWORD.findall(text))
+    
+    return word_freq, emoji_freq, punct_freq
+
+def _build_automaton(indicators: Dict[str, List[str]]) -> ahocorasick.Automaton:
+    """Build one Aho-Corasick automaton matching every indicator of a trait category"""
+    automaton = ahocorasick.Automaton()
+    for subtype, words in indicators.items():
+        for word in words:
+            indicator = word.lower()
+            automaton.add_word(indicator, (subtype, indicator))
+    automaton.make_automaton()
+    return automaton
+
+class AnalyzedMessage(ProcessedMessage, array_like=False):
+    """A Discord message together with its text and personality analysis"""
+    analysis: Dict[str, Any]
+    personality: Dict[str, Any]
+
 class TextProcessor:
     """Processes text data to extract personality traits and style patterns"""
     
     def __init__(self):
         # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
+        _ensure_nltk()
+        from nltk.corpus import stopwords
         
-        self.stop_words = set(stopwords.words('english'))
+        self.stop_words = frozenset(stopwords.words('english'))
         
         # Personality trait indicators
         self.trait_indicators = {
@@ -52,11 +158,21 @@ class TextProcessor:
                 "chaotic": ["😵‍💫", "🤯", "💥", "explosion", "chaos", "random"]
             }
         }
+        
+        # Scan each category in a single pass over the text
+        self._automata = {
+            category: _build_automaton(indicators)
+            for category, indicators in self.trait_indicators.items()
+        }
+        
+        # Per-instance memoization of the pure per-text analyses
+        self._analyze_text = lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)(self._analyze_text)
+        self._extract_personality_indicators = lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)(self._extract_personality_indicators)
     
-    def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def process_message(self, message: ProcessedMessage) -> Optional[AnalyzedMessage]:
         """Process a Discord message for personality analysis"""
         try:
-            content = message.get("content", "")
+            content = message.content
             if not content or len(content.strip()) < 3:
                 return None
             
@@ -67,11 +183,7 @@ class TextProcessor:
             personality = self._extract_personality_indicators(content)
             
             # Combine with original message data
-            processed = {
-                **message,
-                "analysis": analysis,
-                "personality": personality
-            }
+            processed = AnalyzedMessage(*msgspec.structs.astuple(message), analysis, personality)
             
             return processed
             
@@ -137,51 +249,53 @@ class TextProcessor:
             logger.error(f"Failed to process post: {e}")
             return None
     
-    def _analyze_text(self, text: str) -> Dict[str, Any]:
-        """Perform basic text analysis"""
+    def _analyze_text(self, text: str, class_counts: Optional[Tuple[int, ...]] = None) -> Dict[str, Any]:
+        """Perform basic text analysis (class_counts may come precomputed from a batch)"""
         try:
-            blob = TextBlob(text)
-            
-            # Basic statistics
-            sentences = sent_tokenize(text)
-            words = word_tokenize(text.lower())
-            words_no_stop = [w for w in words if w.isalpha() and w not in self.stop_words]
+            # Basic statistics (single regex pass each instead of NLTK tokenizers)
+            sentences = [sentence for sentence in _RE_SENT.split(text.strip()) if sentence]
+            words = _prepare_text(text)[1]
+            # Regex words are letters and apostrophes, so "alphabetic" just
+            # means apostrophe-free; only the count is needed
+            stop_words = self.stop_words
+            words_no_stop_count = sum(1 for w in words if "'" not in w and w not in stop_words)
             
             # Emoji analysis
-            emoji_list = emoji.emoji_list(text)
+            emoji_list = _find_emojis(text)
             emoji_count = len(emoji_list)
             
             # Punctuation analysis
-            punctuation = re.findall(r'[^\w\s]', text)
-            punctuation_count = len(punctuation)
+            punctuation_count = len(_RE_NONWORD.findall(text))
             
-            # Capitalization analysis
-            caps_count = len(re.findall(r'[A-Z]', text))
+            # Capitalization and ! / ? counts; batches share one lookup-table
+            # pass, while a lone text is cheaper to scan directly
+            if class_counts is None:
+                class_counts = (0, len(_RE_CAPS.findall(text)), text.count('!'), text.count('?'))
+            caps_count = class_counts[_CLASS_UPPER]
             caps_ratio = caps_count / len(text) if text else 0
             
             # Sentiment analysis
-            sentiment = blob.sentiment
+            sentiment = _text_blob()(text).sentiment
             
             analysis = {
                 "length": {
                     "characters": len(text),
                     "words": len(words),
                     "sentences": len(sentences),
-                    "words_no_stop": len(words_no_stop)
+                    "words_no_stop": words_no_stop_count
                 },
                 "complexity": {
                     "avg_sentence_length": len(words) / len(sentences) if sentences else 0,
-                    "avg_word_length": np.mean([len(w) for w in words]) if words else 0,
+                    "avg_word_length": fmean(map(len, words)) if words else 0.0,
                     "unique_words_ratio": len(set(words)) / len(words) if words else 0
                 },
                 "style": {
                     "emoji_count": emoji_count,
-                    "emoji_list": [e['emoji'] for e in emoji_list],
+                    "emoji_list": list(emoji_list),
                     "punctuation_count": punctuation_count,
-                    "punctuation_types": Counter(punctuation),
                     "caps_ratio": caps_ratio,
-                    "exclamation_count": text.count('!'),
-                    "question_count": text.count('?'),
+                    "exclamation_count": class_counts[_CLASS_EXCLAMATION],
+                    "question_count": class_counts[_CLASS_QUESTION],
                     "ellipsis_count": text.count('...')
                 },
                 "sentiment": {
@@ -198,7 +312,7 @@ class TextProcessor:
     
     def _extract_personality_indicators(self, text: str) -> Dict[str, Any]:
         """Extract personality indicators from text"""
-        text_lower = text.lower()
+        text_lower, _ = _prepare_text(text)
         
         personality = {
             "humor_type": self._classify_humor(text_lower),
@@ -211,19 +325,17 @@ class TextProcessor:
         
         return personality
     
+    def _score_indicators(self, category: str, text: str) -> Dict[str, int]:
+        """Count the distinct indicators of each subtype present in the text"""
+        scores = dict.fromkeys(self.trait_indicators[category], 0)
+        found = {match for _, match in self._automata[category].iter(text)}
+        for subtype, _ in found:
+            scores[subtype] += 1
+        return scores
+    
     def _classify_humor(self, text: str) -> str:
         """Classify the type of humor used"""
-        scores = {
-            "sarcastic": 0,
-            "wholesome": 0,
-            "dark": 0,
-            "absurdist": 0
-        }
-        
-        for humor_type, indicators in self.trait_indicators["humor"].items():
-            for indicator in indicators:
-                if indicator.lower() in text:
-                    scores[humor_type] += 1
+        scores = self._score_indicators("humor", text)
         
         if max(scores.values()) == 0:
             return "neutral"
@@ -232,16 +344,7 @@ class TextProcessor:
     
     def _classify_formality(self, text: str) -> str:
         """Classify the formality level"""
-        scores = {
-            "casual": 0,
-            "formal": 0,
-            "professional": 0
-        }
-        
-        for formality_type, indicators in self.trait_indicators["formality"].items():
-            for indicator in indicators:
-                if indicator.lower() in text:
-                    scores[formality_type] += 1
+        scores = self._score_indicators("formality", text)
         
         if max(scores.values()) == 0:
             return "neutral"
@@ -250,20 +353,11 @@ class TextProcessor:
     
     def _classify_energy(self, text: str) -> str:
         """Classify the energy level"""
-        scores = {
-            "high": 0,
-            "low": 0,
-            "chaotic": 0
-        }
-        
-        for energy_type, indicators in self.trait_indicators["energy"].items():
-            for indicator in indicators:
-                if indicator.lower() in text:
-                    scores[energy_type] += 1
+        scores = self._score_indicators("energy", text)
         
         # Count exclamation marks and caps
         scores["high"] += text.count('!') * 2
-        scores["high"] += len(re.findall(r'[A-Z]{3,}', text))
+        scores["high"] += len(_RE_ALLCAPS3.findall(text))
         
         if max(scores.values()) == 0:
             return "neutral"
@@ -273,7 +367,7 @@ class TextProcessor:
     def _classify_communication_style(self, text: str) -> str:
         """Classify communication style"""
         # Analyze patterns
-        if re.search(r'[A-Z]{3,}', text):  # ALL CAPS
+        if _RE_ALLCAPS3.search(text):  # ALL CAPS
             return "emphatic"
         elif text.count('...') > 2:  # Lots of ellipsis
             return "contemplative"
@@ -288,17 +382,15 @@ class TextProcessor:
     
     def _analyze_emoji_usage(self, text: str) -> Dict[str, Any]:
         """Analyze emoji usage patterns"""
-        emoji_list = emoji.emoji_list(text)
+        emoji_types = _find_emojis(text)
         
-        if not emoji_list:
+        if not emoji_types:
             return {"frequent": False, "types": [], "count": 0}
         
-        emoji_types = [e['emoji'] for e in emoji_list]
-        
         return {
-            "frequent": len(emoji_list) > 2,
+            "frequent": len(emoji_types) > 2,
             "types": list(set(emoji_types)),
-            "count": len(emoji_list),
+            "count": len(emoji_types),
             "diversity": len(set(emoji_types)) / len(emoji_types) if emoji_types else 0
         }
     
@@ -308,8 +400,8 @@ class TextProcessor:
             "exclamation_frequent": text.count('!') > 2,
             "question_frequent": text.count('?') > 2,
             "ellipsis_frequent": text.count('...') > 1,
-            "caps_frequent": len(re.findall(r'[A-Z]{3,}', text)) > 0,
-            "punctuation_density": len(re.findall(r'[^\w\s]', text)) / len(text) if text else 0
+            "caps_frequent": len(_RE_ALLCAPS3.findall(text)) > 0,
+            "punctuation_density": len(_RE_NONWORD.findall(text)) / len(text) if text else 0
         }
     
     def _analyze_email_structure(self, email: Dict[str, Any]) -> Dict[str, Any]:
@@ -321,8 +413,9 @@ class TextProcessor:
         greetings = ["dear", "hi", "hello", "hey", "good morning", "good afternoon"]
         closings = ["sincerely", "regards", "best", "thanks", "cheers", "bye"]
         
-        has_greeting = any(greeting in content.lower()[:100] for greeting in greetings)
-        has_closing = any(closing in content.lower()[-100:] for closing in closings)
+        content_lower = content.lower()
+        has_greeting = any(greeting in content_lower[:100] for greeting in greetings)
+        has_closing = any(closing in content_lower[-100:] for closing in closings)
         
         return {
             "has_greeting": has_greeting,
@@ -334,9 +427,9 @@ class TextProcessor:
     def _analyze_post_engagement(self, post: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze post engagement patterns"""
         return {
-            "hashtags": len(re.findall(r'#\w+', post.get("content", ""))),
-            "mentions": len(re.findall(r'@\w+', post.get("content", ""))),
-            "links": len(re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', post.get("content", ""))),
+            "hashtags": len(_RE_HASHTAG.findall(post.get("content", ""))),
+            "mentions": len(_RE_MENTION.findall(post.get("content", ""))),
+            "links": len(_RE_URL.findall(post.get("content", ""))),
             "engagement_rate": post.get("engagement_rate", 0)
         }
     
@@ -349,21 +442,32 @@ class TextProcessor:
         all_analyses = []
         all_personalities = []
         
-        for text in texts:
-            analysis = self._analyze_text(text)
-            personality = self._extract_personality_indicators(text)
-            
-            if analysis:
-                all_analyses.append(analysis)
-            if personality:
-                all_personalities.append(personality)
+        for analysis, personality in _analyze_chunk(texts, self):
+            all_analyses.append(analysis)
+            all_personalities.append(personality)
+        
+        return self.aggregate_personality(all_analyses, all_personalities)
+    
+    def aggregate_personality(self, all_analyses: List[Dict[str, Any]], all_personalities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-text analyses into personality traits"""
+        all_analyses = [a for a in all_analyses if a]
+        all_personalities = [p for p in all_personalities if p]
         
         if not all_analyses:
             return {}
         
-        # Aggregate statistics
-        avg_sentiment = np.mean([a.get("sentiment", {}).get("polarity", 0) for a in all_analyses])
-        avg_subjectivity = np.mean([a.get("sentiment", {}).get("subjectivity", 0) for a in all_analyses])
+        # Aggregate statistics: gather the numeric fields into one float64
+        # array in a single pass and reduce every column at once
+        metrics = np.empty((len(all_analyses), 4), dtype=np.float64)
+        for row, a in enumerate(all_analyses):
+            sentiment = a.get("sentiment", {})
+            metrics[row] = (
+                sentiment.get("polarity", 0),
+                sentiment.get("subjectivity", 0),
+                a.get("length", {}).get("words", 0),
+                a.get("complexity", {}).get("avg_sentence_length", 0)
+            )
+        avg_sentiment, avg_subjectivity, avg_message_length, avg_sentence_length = metrics.mean(axis=0)
         
         # Most common personality traits
         humor_types = [p.get("humor_type", "neutral") for p in all_personalities]
@@ -387,8 +491,8 @@ class TextProcessor:
             "style_preferences": {
                 "emoji_frequent": emoji_frequency > 0.3,
                 "emoji_frequency": emoji_frequency,
-                "avg_message_length": np.mean([a.get("length", {}).get("words", 0) for a in all_analyses]),
-                "avg_sentence_length": np.mean([a.get("complexity", {}).get("avg_sentence_length", 0) for a in all_analyses])
+                "avg_message_length": avg_message_length,
+                "avg_sentence_length": avg_sentence_length
             }
         }
     
@@ -398,46 +502,35 @@ class TextProcessor:
             return {}
         
         # Analyze common patterns
-        all_words = []
-        all_emojis = []
-        all_punctuation = []
+        word_freq, emoji_freq, punct_freq = _style_chunk(texts)
         
-        for text in texts:
-            words = word_tokenize(text.lower())
-            all_words.extend([w for w in words if w.isalpha()])
-            
-            emoji_list = emoji.emoji_list(text)
-            all_emojis.extend([e['emoji'] for e in emoji_list])
-            
-            punctuation = re.findall(r'[^\w\s]', text)
-            all_punctuation.extend(punctuation)
+        total_words = sum(word_freq.values())
+        total_emojis = sum(emoji_freq.values())
+        total_punctuation = sum(punct_freq.values())
         
         # Most common words (excluding stop words)
-        word_freq = Counter(all_words)
         common_words = [word for word, count in word_freq.most_common(20) 
                        if word not in self.stop_words and len(word) > 2]
         
         # Most common emojis
-        emoji_freq = Counter(all_emojis)
         common_emojis = [emoji for emoji, count in emoji_freq.most_common(10)]
         
         # Punctuation patterns
-        punct_freq = Counter(all_punctuation)
         common_punctuation = [punct for punct, count in punct_freq.most_common(5)]
         
         return {
             "vocabulary": {
                 "common_words": common_words,
-                "vocabulary_size": len(set(all_words)),
-                "word_diversity": len(set(all_words)) / len(all_words) if all_words else 0
+                "vocabulary_size": len(word_freq),
+                "word_diversity": len(word_freq) / total_words if total_words else 0
             },
             "emoji_patterns": {
                 "common_emojis": common_emojis,
-                "emoji_diversity": len(set(all_emojis)) / len(all_emojis) if all_emojis else 0,
-                "total_emojis": len(all_emojis)
+                "emoji_diversity": len(emoji_freq) / total_emojis if total_emojis else 0,
+                "total_emojis": total_emojis
             },
             "punctuation_patterns": {
                 "common_punctuation": common_punctuation,
-                "punctuation_diversity": len(set(all_punctuation)) / len(all_punctuation) if all_punctuation else 0
+                "punctuation_diversity": len(punct_freq) / total_punctuation if total_punctuation else 0
             }
         } 
\ No newline at end of file
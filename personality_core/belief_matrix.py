@@ -3,57 +3,80 @@ Belief Matrix
 Manages user beliefs and values for personality modeling
 """
 
+import asyncio
 import logging
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Dict, List, Optional, Any
-from collections import defaultdict
+from collections import Counter, defaultdict
+import ahocorasick
 
 logger = logging.getLogger(__name__)
 
+# Keywords signalling each (category, belief)
+BELIEF_KEYWORDS = {
+    # Political beliefs
+    ("politics", "liberal"): ["liberal", "progressive", "left"],
+    ("politics", "conservative"): ["conservative", "republican", "right"],
+    
+    # Social beliefs
+    ("social", "equality"): ["equality", "justice", "rights"],
+    ("social", "traditional"): ["tradition", "family", "values"],
+    
+    # Economic beliefs
+    ("economics", "capitalist"): ["capitalism", "free market", "business"],
+    ("economics", "socialist"): ["socialism", "welfare", "government"],
+}
+
 class BeliefMatrix:
     """Manages user beliefs and values"""
     
     def __init__(self):
-        self.beliefs = defaultdict(dict)
+        self.beliefs = defaultdict(Counter)
         self.values = defaultdict(float)
         
+        # One automaton over every belief keyword, tagged with its belief
+        self._keywords = ahocorasick.Automaton()
+        for belief, words in BELIEF_KEYWORDS.items():
+            for word in words:
+                self._keywords.add_word(word, belief)
+        self._keywords.make_automaton()
+        
     async def build_from_data(self, training_data: List[Dict[str, Any]]):
+        """Build belief matrix from training data without blocking the event loop"""
+        await asyncio.to_thread(self.build_from_data_sync, training_data)
+    
+    def build_from_data_sync(self, training_data: List[Dict[str, Any]]):
         """Build belief matrix from training data"""
         try:
-            # Extract beliefs from training data
-            for item in training_data:
-                content = item.get("content", "")
-                if content:
-                    await self._extract_beliefs_from_text(content)
+            # Extract beliefs from training data, then merge the counts once
+            texts = [item.get("content", "") for item in training_data]
+            counts = self._extract_beliefs_from_texts([text for text in texts if text])
+            
+            for (category, belief), count in counts.items():
+                self.beliefs[category][belief] += count
             
             logger.info(f"🧠 Built belief matrix with {len(self.beliefs)} belief categories")
             
         except Exception as e:
             logger.error(f"Failed to build belief matrix: {e}")
     
-    async def _extract_beliefs_from_text(self, text: str):
-        """Extract beliefs from text content"""
+    def _extract_beliefs_from_texts(self, texts: List[str]) -> Counter:
+        """Count the texts expressing each (category, belief) pair"""
         # This is a simplified implementation
         # In practice, you'd use more sophisticated NLP techniques
         
-        text_lower = text.lower()
-        
-        # Political beliefs
-        if any(word in text_lower for word in ["liberal", "progressive", "left"]):
-            self.beliefs["politics"]["liberal"] = self.beliefs["politics"].get("liberal", 0) + 1
-        if any(word in text_lower for word in ["conservative", "republican", "right"]):
-            self.beliefs["politics"]["conservative"] = self.beliefs["politics"].get("conservative", 0) + 1
-        
-        # Social beliefs
-        if any(word in text_lower for word in ["equality", "justice", "rights"]):
-            self.beliefs["social"]["equality"] = self.beliefs["social"].get("equality", 0) + 1
-        if any(word in text_lower for word in ["tradition", "family", "values"]):
-            self.beliefs["social"]["traditional"] = self.beliefs["social"].get("traditional", 0) + 1
+        # Scan all texts in one automaton pass over a NUL-separated corpus
+        # (no keyword contains NUL, so matches never straddle two texts)
+        lowered = [text.lower() for text in texts]
+        boundaries = list(accumulate(len(text) + 1 for text in lowered))
         
-        # Economic beliefs
-        if any(word in text_lower for word in ["capitalism", "free market", "business"]):
-            self.beliefs["economics"]["capitalist"] = self.beliefs["economics"].get("capitalist", 0) + 1
-        if any(word in text_lower for word in ["socialism", "welfare", "government"]):
-            self.beliefs["economics"]["socialist"] = self.beliefs["economics"].get("socialist", 0) + 1
+        # Each belief counts once per text, however many keywords match
+        hits = {
+            (bisect_right(boundaries, end), belief)
+            for end, belief in self._keywords.iter("\x00".join(lowered))
+        }
+        return Counter(belief for _, belief in hits)
     
     def get_beliefs(self) -> Dict[str, Any]:
         """Get current beliefs"""
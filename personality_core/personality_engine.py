@@ -3,11 +3,20 @@ Personality Engine
 Builds and manages the AI's personality model based on user data
 """
 
+import os
+import re
+import asyncio
+import random
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from collections import Counter, OrderedDict
 from pathlib import Path
 import numpy as np
+import faiss
+import torch
 from sentence_transformers import SentenceTransformer
 import openai
 
@@ -16,12 +25,98 @@ from .belief_matrix import BeliefMatrix
 
 logger = logging.getLogger(__name__)
 
+# HNSW graph parameters for the similarity index
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# Semantic response cache: near-identical prompts (same mood and context)
+# reuse the previous response instead of calling the API again
+SEMANTIC_CACHE_SIZE = 1024
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Recently encoded query texts kept in memory
+QUERY_CACHE_SIZE = 4096
+
+# On-disk embedding cache shared across training runs
+EMBEDDING_CACHE_PATH = "models/embedding_cache.sqlite"
+EMBEDDING_BATCH_SIZE = 1024
+_SQLITE_MAX_PARAMS = 900
+
+# Categorical personality traits and their default values
+CATEGORICAL_TRAITS = {
+    "communication_style": "balanced",
+    "humor_type": "neutral",
+    "formality_level": "neutral",
+    "energy_level": "neutral",
+}
+
+# Canned replies per mood for when the API is unavailable
+FALLBACK_RESPONSES = {
+    "default": ("Got it!", "Sure thing!", "Makes sense."),
+    "energetic": ("YES! 🔥", "Absolutely! 💯", "Let's go! 🚀"),
+    "savage": ("Obviously.", "Duh.", "Sure, whatever."),
+    "unhinged": ("😵‍💫", "🤯", "💥"),
+    "professional": ("Understood.", "I'll take care of that.", "Noted."),
+    "casual": ("Cool!", "Got it!", "Sounds good!")
+}
+UNTRAINED_RESPONSE = "I'm still learning your personality. Please train me first!"
+ERROR_RESPONSE = "Sorry, I'm having trouble responding right now."
+
+# Every reply produced without the model, which callers should not cache
+CANNED_RESPONSES = frozenset(
+    [reply for replies in FALLBACK_RESPONSES.values() for reply in replies] + [UNTRAINED_RESPONSE, ERROR_RESPONSE]
+)
+
+# Whitespace-delimited, purely alphabetic tokens of three or more letters
+_RE_VOCAB_WORD = re.compile(r"(?<!\S)[^\W\d_]{3,}(?!\S)")
+
+class _EmbCache:
+    """Content-addressed SQLite store of text embeddings"""
+    
+    def __init__(self, path: str, model_name: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self.model_name = model_name
+    
+    def key(self, text: str) -> str:
+        """Cache key for a text under the current model"""
+        return hashlib.sha1(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors, returning only the hits"""
+        found = {}
+        for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+            batch = keys[start:start + _SQLITE_MAX_PARAMS]
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Store vectors in a single transaction"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in zip(keys, vectors)]
+            )
+
 class PersonalityEngine:
     """Core personality modeling engine for the AI doppelgänger"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", embedding_cache_path: str = EMBEDDING_CACHE_PATH):
         self.model_name = model_name
         self.sentence_model = None
+        self.embedding_cache_path = embedding_cache_path
+        
+        # Inference backend for the sentence model: "torch", "onnx" or
+        # "openvino", optionally pinned to a specific (e.g. quantized) file
+        self.embedding_backend = os.getenv("EMBEDDING_BACKEND", "torch")
+        self.embedding_model_file = os.getenv("EMBEDDING_MODEL_FILE") or None
+        self._use_cuda = False
+        self._emb_cache = None
         self.style_embedding = StyleEmbedding()
         self.belief_matrix = BeliefMatrix()
         
@@ -29,21 +124,37 @@ class PersonalityEngine:
         self.personality_profile = {}
         self.style_patterns = {}
         self.trained = False
+        self.model_version = 0  # bumped whenever the personality changes
         
-        # Vector database for similarity search
-        self.embeddings = []
+        # Vector database for similarity search: an HNSW index over
+        # L2-normalized embeddings, row-aligned with self.texts
+        self.index = None
         self.texts = []
         
+        # Semantic cache slots, evicted least-recently-used. Each slot keeps
+        # the (mood, context) it was generated for; lookups only match slots
+        # with the same pair, prefiltered by its hash
+        self._sem_cache_embs = None
+        self._sem_cache_responses: List[str] = []
+        self._sem_cache_scopes: List[Tuple[str, str]] = []
+        self._sem_cache_scope_hashes = np.zeros(SEMANTIC_CACHE_SIZE, dtype=np.int64)
+        self._sem_cache_used = np.zeros(SEMANTIC_CACHE_SIZE, dtype=np.int64)
+        self._sem_cache_clock = 0
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
         logger.info("🧠 Personality Engine initialized")
     
-    async def train_personality(self, training_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def train_personality(self, training_data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """Train the personality model on user data"""
         logger.info("🎯 Training personality model...")
         
+        # Training walks the data several times, so materialize one-shot iterators once
+        training_data = list(training_data)
+        
         try:
             # Initialize sentence transformer
             if not self.sentence_model:
-                self.sentence_model = SentenceTransformer(self.model_name)
+                self.sentence_model = self._load_sentence_model()
             
             # Extract personality traits
             self.personality_profile = await self._extract_personality_traits(training_data)
@@ -57,7 +168,11 @@ class PersonalityEngine:
             # Build embedding database for similarity search
             await self._build_embedding_database(training_data)
             
+            # Responses cached under the previous personality are stale
+            self._clear_semantic_cache()
+            
             self.trained = True
+            self.model_version += 1
             logger.info("✅ Personality model training complete")
             
             return {
@@ -71,6 +186,18 @@ class PersonalityEngine:
             logger.error(f"❌ Personality training failed: {e}")
             return {"success": False, "error": str(e)}
     
+    def _load_sentence_model(self) -> SentenceTransformer:
+        """Load the sentence model on the configured inference backend"""
+        if self.embedding_backend == "torch":
+            # Use every core for CPU inference; run on the GPU when present
+            torch.set_num_threads(os.cpu_count() or 1)
+            self._use_cuda = torch.cuda.is_available()
+            return SentenceTransformer(self.model_name, device="cuda" if self._use_cuda else "cpu")
+        
+        model_kwargs = {"file_name": self.embedding_model_file} if self.embedding_model_file else None
+        logger.info(f"⚡ Loading {self.model_name} with the {self.embedding_backend} backend")
+        return SentenceTransformer(self.model_name, backend=self.embedding_backend, model_kwargs=model_kwargs)
+    
     async def _extract_personality_traits(self, training_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Extract personality traits from training data"""
         traits = {
@@ -83,48 +210,33 @@ class PersonalityEngine:
             "values": {}
         }
         
-        # Aggregate personality indicators from all training data
-        all_personalities = []
+        # Aggregate personality indicators from all training data in one pass
+        counters = {trait: Counter() for trait in CATEGORICAL_TRAITS}
+        emoji_frequent = 0
+        total = 0
         for item in training_data:
-            if "personality" in item:
-                all_personalities.append(item["personality"])
-        
-        if not all_personalities:
+            personality = item.get("personality")
+            if personality is None:
+                continue
+            total += 1
+            for trait, default in CATEGORICAL_TRAITS.items():
+                counters[trait][personality.get(trait, default)] += 1
+            emoji_frequent += bool(personality.get("emoji_usage", {}).get("frequent", False))
+        
+        if not total:
             return traits
         
-        # Analyze communication style
-        comm_styles = [p.get("communication_style", "balanced") for p in all_personalities]
-        traits["communication_style"] = {
-            "primary": self._get_most_common(comm_styles),
-            "distribution": dict(Counter(comm_styles))
-        }
-        
-        # Analyze humor type
-        humor_types = [p.get("humor_type", "neutral") for p in all_personalities]
-        traits["humor_type"] = {
-            "primary": self._get_most_common(humor_types),
-            "distribution": dict(Counter(humor_types))
-        }
-        
-        # Analyze formality level
-        formality_levels = [p.get("formality_level", "neutral") for p in all_personalities]
-        traits["formality_level"] = {
-            "primary": self._get_most_common(formality_levels),
-            "distribution": dict(Counter(formality_levels))
-        }
-        
-        # Analyze energy level
-        energy_levels = [p.get("energy_level", "neutral") for p in all_personalities]
-        traits["energy_level"] = {
-            "primary": self._get_most_common(energy_levels),
-            "distribution": dict(Counter(energy_levels))
-        }
+        # Primary value and distribution of each categorical trait
+        for trait, counter in counters.items():
+            traits[trait] = {
+                "primary": counter.most_common(1)[0][0],
+                "distribution": dict(counter)
+            }
         
         # Analyze emoji usage
-        emoji_usage = [p.get("emoji_usage", {}).get("frequent", False) for p in all_personalities]
         traits["emoji_preference"] = {
-            "frequent_user": sum(emoji_usage) / len(emoji_usage) > 0.3,
-            "frequency": sum(emoji_usage) / len(emoji_usage)
+            "frequent_user": emoji_frequent / total > 0.3,
+            "frequency": emoji_frequent / total
         }
         
         return traits
@@ -139,47 +251,47 @@ class PersonalityEngine:
             "response_patterns": {}
         }
         
-        # Extract all text content
-        all_texts = []
-        for item in training_data:
-            content = item.get("content", "")
-            if content:
-                all_texts.append(content)
+        # Gather vocabulary, sentence and punctuation statistics in one pass
+        word_freq = Counter()
+        sentence_count = sentence_total = sentence_squares = 0
+        punct_patterns = {"exclamation": 0, "question": 0, "ellipsis": 0}
+        has_text = False
         
-        if not all_texts:
+        for item in training_data:
+            text = item.get("content", "")
+            if not text:
+                continue
+            has_text = True
+            
+            word_freq.update(_RE_VOCAB_WORD.findall(text.lower()))
+            for sentence in text.split('.'):
+                if sentence.strip():
+                    length = len(sentence.split())
+                    sentence_count += 1
+                    sentence_total += length
+                    sentence_squares += length * length
+            punct_patterns["exclamation"] += text.count('!')
+            punct_patterns["question"] += text.count('?')
+            punct_patterns["ellipsis"] += text.count('...')
+        
+        if not has_text:
             return patterns
         
-        # Analyze vocabulary patterns
-        all_words = []
-        for text in all_texts:
-            words = text.lower().split()
-            all_words.extend([w for w in words if w.isalpha() and len(w) > 2])
-        
-        word_freq = Counter(all_words)
+        total_words = sum(word_freq.values())
         patterns["vocabulary"] = {
             "common_words": [word for word, count in word_freq.most_common(20)],
-            "vocabulary_size": len(set(all_words)),
-            "word_diversity": len(set(all_words)) / len(all_words) if all_words else 0
+            "vocabulary_size": len(word_freq),
+            "word_diversity": len(word_freq) / total_words if total_words else 0
         }
         
-        # Analyze sentence structure
-        sentence_lengths = []
-        for text in all_texts:
-            sentences = text.split('.')
-            sentence_lengths.extend([len(s.split()) for s in sentences if s.strip()])
-        
         patterns["sentence_structure"] = {
-            "avg_sentence_length": np.mean(sentence_lengths) if sentence_lengths else 0,
-            "sentence_length_variance": np.var(sentence_lengths) if sentence_lengths else 0
+            "avg_sentence_length": sentence_total / sentence_count if sentence_count else 0,
+            "sentence_length_variance": (
+                (sentence_count * sentence_squares - sentence_total * sentence_total) / sentence_count ** 2
+                if sentence_count else 0
+            )
         }
         
-        # Analyze punctuation patterns
-        punct_patterns = {}
-        for text in all_texts:
-            punct_patterns["exclamation"] = punct_patterns.get("exclamation", 0) + text.count('!')
-            punct_patterns["question"] = punct_patterns.get("question", 0) + text.count('?')
-            punct_patterns["ellipsis"] = punct_patterns.get("ellipsis", 0) + text.count('...')
-        
         patterns["punctuation"] = punct_patterns
         
         return patterns
@@ -198,21 +310,45 @@ class PersonalityEngine:
         if not texts:
             return
         
-        # Generate embeddings
-        embeddings = self.sentence_model.encode(texts)
+        # Generate normalized embeddings so inner product is cosine similarity,
+        # encoding only texts that are not already in the on-disk cache
+        if self._emb_cache is None:
+            # Vectors differ between backends and quantized files, so key on both
+            model_id = "|".join(filter(None, [self.model_name, self.embedding_backend, self.embedding_model_file]))
+            self._emb_cache = _EmbCache(self.embedding_cache_path, model_id)
+        
+        keys = [self._emb_cache.key(text) for text in texts]
+        vectors = self._emb_cache.get_many(list(dict.fromkeys(keys)))
+        
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if misses:
+            # Encode in length order so each batch pads to similar lengths,
+            # then undo the permutation
+            miss_texts = list(misses.values())
+            order = np.argsort([len(text) for text in miss_texts], kind="stable")
+            encoded = self._encode([miss_texts[i] for i in order], batch_size=EMBEDDING_BATCH_SIZE)
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            encoded = encoded[inverse]
+            
+            self._emb_cache.put_many(list(misses), encoded)
+            vectors.update(zip(misses, encoded))
         
-        self.embeddings = embeddings
-        self.texts = texts
+        embeddings = np.ascontiguousarray(np.stack([vectors[key] for key in keys]), dtype=np.float32)
+        faiss.normalize_L2(embeddings)
         
-        logger.info(f"📚 Built embedding database with {len(texts)} texts")
-    
-    def _get_most_common(self, items: List[str]) -> str:
-        """Get the most common item from a list"""
-        if not items:
-            return "neutral"
+        # Store vectors as fp16 to halve the bytes scanned per search
+        index = faiss.IndexHNSWSQ(
+            embeddings.shape[1], faiss.ScalarQuantizer.QT_fp16, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.train(embeddings)
+        index.add(embeddings)
+        
+        self.index = index
+        self.texts = texts
         
-        counter = Counter(items)
-        return counter.most_common(1)[0][0]
+        logger.info(f"📚 Built embedding database with {len(texts)} texts ({len(misses)} newly encoded)")
     
     async def generate_response(self, 
                               input_text: str, 
@@ -220,38 +356,121 @@ class PersonalityEngine:
                               mood: str = "default") -> str:
         """Generate a response in the user's style"""
         if not self.trained:
-            return "I'm still learning your personality. Please train me first!"
+            return UNTRAINED_RESPONSE
         
         try:
+            # A model restored from disk has its index but loads the
+            # encoder only when the first response needs it
+            if self.sentence_model is None and self.index is not None:
+                self.sentence_model = await asyncio.to_thread(self._load_sentence_model)
+            
+            # Serve near-identical requests from the semantic cache
+            cache_key = self._semantic_cache_key(input_text)
+            cached = self._semantic_cache_lookup(cache_key, (mood, context))
+            if cached is not None:
+                return cached
+            
             # Find similar responses from training data
             similar_responses = await self._find_similar_responses(input_text, context)
             
             # Generate response using OpenAI with personality guidance
-            response = await self._generate_with_personality(input_text, context, mood, similar_responses)
+            response = await self._generate_with_personality(input_text, context, mood, similar_responses, cache_key)
             
             return response
             
         except Exception as e:
             logger.error(f"Response generation failed: {e}")
-            return "Sorry, I'm having trouble responding right now."
+            return ERROR_RESPONSE
+    
+    def _semantic_cache_key(self, input_text: str) -> Optional[np.ndarray]:
+        """Normalized embedding of the input text, compared against semantic cache slots"""
+        if not self.sentence_model:
+            return None
+        return self._encode_query(input_text)
+    
+    def _encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Encode texts to normalized float32 embeddings without autograd, in FP16 on the GPU"""
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=self._use_cuda):
+            embeddings = self.sentence_model.encode(
+                texts, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False, **kwargs
+            )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Normalized float32 embedding of a query, memoized with a bounded LRU"""
+        embedding = self._query_cache.get(text)
+        if embedding is not None:
+            self._query_cache.move_to_end(text)
+            return embedding
+        
+        embedding = self._encode([text])
+        faiss.normalize_L2(embedding)
+        embedding = embedding[0]
+        embedding.setflags(write=False)
+        
+        self._query_cache[text] = embedding
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return embedding
+    
+    def _semantic_cache_lookup(self, cache_key: Optional[np.ndarray], scope: Tuple[str, str]) -> Optional[str]:
+        """Return the cached response for a near-identical input with the same (mood, context), if any"""
+        if cache_key is None or not self._sem_cache_responses:
+            return None
+        
+        used = len(self._sem_cache_responses)
+        similarities = self._sem_cache_embs[:used] @ cache_key
+        similarities[self._sem_cache_scope_hashes[:used] != hash(scope)] = -np.inf
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < SEMANTIC_CACHE_THRESHOLD or self._sem_cache_scopes[slot] != scope:
+            return None
+        
+        self._sem_cache_clock += 1
+        self._sem_cache_used[slot] = self._sem_cache_clock
+        return self._sem_cache_responses[slot]
+    
+    def _semantic_cache_store(self, cache_key: Optional[np.ndarray], scope: Tuple[str, str], response: str):
+        """Cache a generated response, evicting the least recently used entry when full"""
+        if cache_key is None:
+            return
+        
+        if self._sem_cache_embs is None or self._sem_cache_embs.shape[1] != cache_key.shape[0]:
+            self._sem_cache_embs = np.zeros((SEMANTIC_CACHE_SIZE, cache_key.shape[0]), dtype=np.float32)
+            self._sem_cache_responses = []
+            self._sem_cache_scopes = []
+        
+        if len(self._sem_cache_responses) < SEMANTIC_CACHE_SIZE:
+            slot = len(self._sem_cache_responses)
+            self._sem_cache_responses.append(response)
+            self._sem_cache_scopes.append(scope)
+        else:
+            slot = int(np.argmin(self._sem_cache_used))
+            self._sem_cache_responses[slot] = response
+            self._sem_cache_scopes[slot] = scope
+        
+        self._sem_cache_embs[slot] = cache_key
+        self._sem_cache_scope_hashes[slot] = hash(scope)
+        self._sem_cache_clock += 1
+        self._sem_cache_used[slot] = self._sem_cache_clock
+    
+    def _clear_semantic_cache(self):
+        """Drop every cached response"""
+        self._sem_cache_embs = None
+        self._sem_cache_responses = []
+        self._sem_cache_scopes = []
+        self._sem_cache_used[:] = 0
     
     async def _find_similar_responses(self, input_text: str, context: str = "") -> List[str]:
         """Find similar responses from training data"""
-        if not self.sentence_model or not self.embeddings.size:
+        if not self.sentence_model or self.index is None or not self.index.ntotal:
             return []
         
-        # Generate embedding for input
-        input_embedding = self.sentence_model.encode([input_text])
-        
-        # Calculate similarities
-        similarities = np.dot(self.embeddings, input_embedding.T).flatten()
-        
-        # Get top similar responses
-        top_indices = np.argsort(similarities)[-5:][::-1]  # Top 5
+        # Approximate top 5 by cosine similarity
+        similarities, indices = self.index.search(self._encode_query(input_text)[None, :], 5)
         
         similar_responses = []
-        for idx in top_indices:
-            if similarities[idx] > 0.3:  # Similarity threshold
+        for similarity, idx in zip(similarities[0], indices[0]):
+            if idx >= 0 and similarity > 0.3:  # Similarity threshold
                 similar_responses.append(self.texts[idx])
         
         return similar_responses
@@ -260,7 +479,8 @@ class PersonalityEngine:
                                        input_text: str, 
                                        context: str, 
                                        mood: str, 
-                                       similar_responses: List[str]) -> str:
+                                       similar_responses: List[str],
+                                       cache_key: Optional[np.ndarray] = None) -> str:
         """Generate response using OpenAI with personality guidance"""
         
         # Build personality prompt
@@ -301,7 +521,9 @@ Respond in your authentic style:
                 temperature=0.8
             )
             
-            return response.choices[0].message.content.strip()
+            generated = response.choices[0].message.content.strip()
+            self._semantic_cache_store(cache_key, (mood, context), generated)
+            return generated
             
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
@@ -325,17 +547,12 @@ Respond in your authentic style:
     
     def _generate_fallback_response(self, input_text: str, mood: str) -> str:
         """Generate a simple fallback response"""
-        responses = {
-            "default": ["Got it!", "Sure thing!", "Makes sense."],
-            "energetic": ["YES! 🔥", "Absolutely! 💯", "Let's go! 🚀"],
-            "savage": ["Obviously.", "Duh.", "Sure, whatever."],
-            "unhinged": ["😵‍💫", "🤯", "💥"],
-            "professional": ["Understood.", "I'll take care of that.", "Noted."],
-            "casual": ["Cool!", "Got it!", "Sounds good!"]
-        }
-        
-        mood_responses = responses.get(mood, responses["default"])
-        return np.random.choice(mood_responses)
+        mood_responses = FALLBACK_RESPONSES.get(mood, FALLBACK_RESPONSES["default"])
+        return random.choice(mood_responses)
+    
+    def is_canned_response(self, response: str) -> bool:
+        """Check whether a response is a canned reply rather than a generated one"""
+        return response in CANNED_RESPONSES
     
     def is_trained(self) -> bool:
         """Check if the personality model is trained"""
@@ -363,12 +580,17 @@ Respond in your authentic style:
             "personality_profile": self.personality_profile,
             "style_patterns": self.style_patterns,
             "trained": self.trained,
-            "model_name": self.model_name
+            "model_name": self.model_name,
+            "texts": self.texts
         }
         
         try:
             with open(filepath, 'w') as f:
                 json.dump(model_data, f, indent=2)
+            
+            # The similarity index is stored next to the JSON model
+            if self.index is not None:
+                faiss.write_index(self.index, str(Path(filepath).with_suffix(".faiss")))
             logger.info(f"💾 Model saved to {filepath}")
         except Exception as e:
             logger.error(f"Failed to save model: {e}")
@@ -383,6 +605,14 @@ Respond in your authentic style:
             self.style_patterns = model_data.get("style_patterns", {})
             self.trained = model_data.get("trained", False)
             self.model_name = model_data.get("model_name", self.model_name)
+            self.texts = model_data.get("texts", [])
+            
+            # Reuse the saved similarity index instead of re-encoding the training texts
+            index_path = Path(filepath).with_suffix(".faiss")
+            self.index = faiss.read_index(str(index_path)) if index_path.exists() else None
+            
+            self._clear_semantic_cache()
+            self.model_version += 1
             
             logger.info(f"📂 Model loaded from {filepath}")
             
@@ -9,39 +9,67 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_INITIAL_CAPACITY = 256
+
 class StyleEmbedding:
     """Handles style embedding and similarity matching"""
     
     def __init__(self):
-        self.embeddings = []
+        # L2-normalized embeddings, one row per text, in a buffer that
+        # grows geometrically
+        self._matrix = None
+        self._size = 0
         self.texts = []
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Stored (normalized) embeddings, row-aligned with texts"""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:self._size]
         
     def add_text(self, text: str, embedding: np.ndarray):
         """Add text and its embedding"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        
+        if self._matrix is None:
+            self._matrix = np.empty((_INITIAL_CAPACITY, vector.size), dtype=np.float32)
+        elif self._size == len(self._matrix):
+            grown = np.empty((2 * len(self._matrix), self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix
+            self._matrix = grown
+        
+        self._matrix[self._size] = vector
+        self._size += 1
         self.texts.append(text)
-        self.embeddings.append(embedding)
         
     def find_similar(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
         """Find similar texts based on embedding"""
-        if not self.embeddings:
+        if not self._size or top_k <= 0:
             return []
         
-        # Calculate similarities
-        similarities = []
-        for i, embedding in enumerate(self.embeddings):
-            similarity = np.dot(query_embedding, embedding) / (np.linalg.norm(query_embedding) * np.linalg.norm(embedding))
-            similarities.append((i, similarity))
+        # Calculate cosine similarities with one matrix-vector product
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        similarities = self.embeddings @ query
         
-        # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Select the top k without sorting everything
+        k = min(top_k, self._size)
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
         
         # Return top k results
         results = []
-        for i, similarity in similarities[:top_k]:
+        for i in top.tolist():
             results.append({
                 "text": self.texts[i],
-                "similarity": float(similarity),
+                "similarity": float(similarities[i]),
                 "index": i
             })
         
-        return results 
\ No newline at end of file
+        return results
\ No newline at end of file
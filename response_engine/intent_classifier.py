@@ -5,10 +5,18 @@ Classifies the intent of incoming messages
 
 import logging
 from typing import Dict, List, Optional, Any
+from collections import defaultdict
 import re
+import ahocorasick
 
 logger = logging.getLogger(__name__)
 
+# Characters that make an intent pattern a real regex rather than a keyword
+_REGEX_META = frozenset(r".^$*+?{}[]\|()")
+
+# Unicode emoji ranges used for the has_emoji context flag
+_EMOJI_RE = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF]')
+
 class IntentClassifier:
     """Classifies the intent of incoming messages"""
     
@@ -45,6 +53,28 @@ class IntentClassifier:
             ]
         }
         
+        # Literal keywords go into one Aho-Corasick automaton tagged with
+        # their intents; the few real regexes are compiled individually
+        keyword_intents = defaultdict(list)
+        regex_patterns = defaultdict(list)
+        for intent, patterns in self.intent_patterns.items():
+            for pattern in patterns:
+                if _REGEX_META.isdisjoint(pattern):
+                    keyword_intents[pattern.lower()].append(intent)
+                else:
+                    regex_patterns[intent].append(pattern)
+        
+        self._keywords = ahocorasick.Automaton()
+        for keyword, intents in keyword_intents.items():
+            self._keywords.add_word(keyword, (keyword, tuple(intents)))
+        self._keywords.make_automaton()
+        
+        self._compiled = [
+            (intent, re.compile(pattern, re.IGNORECASE))
+            for intent, patterns in regex_patterns.items()
+            for pattern in patterns
+        ]
+        
     async def classify_intent(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Classify the intent of a message"""
         try:
@@ -52,14 +82,16 @@ class IntentClassifier:
             sender = message.get("sender", "")
             platform = message.get("platform", "")
             
-            # Score each intent
-            intent_scores = {}
-            for intent, patterns in self.intent_patterns.items():
-                score = 0
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        score += 1
-                intent_scores[intent] = score
+            # Score each intent by how many distinct patterns it matched;
+            # repeating a keyword ("lol lol lol") does not add weight
+            intent_scores = dict.fromkeys(self.intent_patterns, 0)
+            matched = {keyword: intents for _, (keyword, intents) in self._keywords.iter(content)}
+            for intents in matched.values():
+                for intent in intents:
+                    intent_scores[intent] += 1
+            for intent, rx in self._compiled:
+                if rx.search(content):
+                    intent_scores[intent] += 1
             
             # Get primary intent
             primary_intent = max(intent_scores, key=intent_scores.get) if intent_scores else "unknown"
@@ -71,7 +103,7 @@ class IntentClassifier:
             # Additional context
             context = {
                 "is_question": "?" in content,
-                "has_emoji": bool(re.search(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF]', content)),
+                "has_emoji": bool(_EMOJI_RE.search(content)),
                 "is_caps": content.isupper(),
                 "length": len(content),
                 "platform": platform,
@@ -3,16 +3,46 @@ Response Generator
 Coordinates message generation and routing for the AI doppelgänger
 """
 
+import os
+import time
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterable, AsyncIterator
 from datetime import datetime
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from pathlib import Path
 import asyncio
+import msgspec
 
 from .intent_classifier import IntentClassifier
 from .tone_matcher import ToneMatcher
 
 logger = logging.getLogger(__name__)
 
+# Number of responses kept in memory
+RESPONSE_HISTORY_SIZE = 1000
+
+# Number of tone-adjusted responses cached for repeated messages
+RESPONSE_CACHE_SIZE = 1024
+
+# Capacity of each queue between stages of process_incoming_stream
+PIPELINE_QUEUE_SIZE = 8
+_PIPELINE_DONE = object()
+
+class ResponseLogEntry(msgspec.Struct):
+    """A sent response as recorded in the response history"""
+    timestamp: float
+    platform: str
+    message_id: Any
+    sender: str
+    response: str
+    intent: Dict[str, Any]
+    mood: str
+    auto_reply: bool
+
+_LOG_ENCODER = msgspec.json.Encoder()
+
 class ResponseGenerator:
     """Main response generation and routing engine"""
     
@@ -27,14 +57,33 @@ class ResponseGenerator:
         self.override_required = False
         self.current_mood = "default"
         
-        # Response history
-        self.response_history = []
+        # Response history, bounded to the most recent responses
+        self.response_history = deque(maxlen=RESPONSE_HISTORY_SIZE)
+        
+        # Running statistics over the entries currently in the history
+        self._platform_counts = Counter()
+        self._intent_counts = Counter()
+        self._mood_counts = Counter()
+        self._auto_reply_count = 0
+        
+        # Exact-match cache of final responses, valid for one personality model
+        self._response_cache: "OrderedDict[Tuple[str, str, str, str], str]" = OrderedDict()
+        self._response_cache_version = None
+        
+        # Optional append-only JSON Lines log of every sent response
+        self._log_fd = None
+        self._log_buffer = bytearray()
+        log_path = os.getenv("RESPONSE_LOG_PATH")
+        if log_path:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            self._log_fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
         
         logger.info("💬 Response Generator initialized")
     
     def set_personality_engine(self, personality_engine):
         """Set the personality engine reference"""
         self.personality_engine = personality_engine
+        self._response_cache.clear()
     
     def set_safety_monitor(self, safety_monitor):
         """Set the safety monitor reference"""
@@ -44,69 +93,147 @@ class ResponseGenerator:
                                      message: Dict[str, Any], 
                                      platform: str) -> Dict[str, Any]:
         """Process an incoming message and generate appropriate response"""
+        item = {"message": message}
+        for stage in self._pipeline_stages():
+            await self._run_stage(stage, item, platform)
+            if "result" in item:
+                break
+        return item["result"]
+    
+    async def process_incoming_stream(self, 
+                                    messages: AsyncIterable[Dict[str, Any]], 
+                                    platform: str) -> AsyncIterator[Dict[str, Any]]:
+        """Process a stream of incoming messages, yielding results in order
+        
+        Each stage runs as its own worker connected by bounded queues, so
+        later messages are classified while earlier ones are still being
+        generated, safety-checked or sent.
+        """
+        stages = self._pipeline_stages()
+        queues = [asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE) for _ in range(len(stages) + 1)]
+        
+        async def feed():
+            try:
+                async for message in messages:
+                    await queues[0].put({"message": message})
+            finally:
+                await queues[0].put(_PIPELINE_DONE)
+        
+        async def work(stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+            while True:
+                item = await inbox.get()
+                if item is _PIPELINE_DONE:
+                    await outbox.put(item)
+                    return
+                if "result" not in item:
+                    await self._run_stage(stage, item, platform)
+                await outbox.put(item)
+        
+        feeder = asyncio.create_task(feed())
+        workers = [
+            asyncio.create_task(work(stage, queues[i], queues[i + 1]))
+            for i, stage in enumerate(stages)
+        ]
         
         try:
-            # Classify intent
-            intent = await self.intent_classifier.classify_intent(message)
-            
-            # Check if auto-reply is enabled
-            if not self.auto_reply_enabled:
-                return {
-                    "action": "manual_review",
-                    "reason": "Auto-reply disabled",
-                    "intent": intent,
-                    "message": message
-                }
-            
-            # Generate response
-            response = await self._generate_response(message, intent, platform)
-            
-            # Safety check
-            if self.safety_monitor:
-                safety_check = await self.safety_monitor.check_response(response, message)
-                if not safety_check["safe"]:
-                    return {
-                        "action": "manual_review",
-                        "reason": f"Safety concern: {safety_check['reason']}",
-                        "intent": intent,
-                        "response": response,
-                        "message": message
-                    }
-            
-            # Check if override is required
-            if self.override_required:
-                return {
-                    "action": "manual_approval",
-                    "intent": intent,
-                    "response": response,
-                    "message": message
-                }
-            
-            # Send response
-            await self._send_response(response, platform, message)
-            
-            # Log response
-            self._log_response(message, response, intent, platform)
-            
-            return {
-                "action": "sent",
-                "intent": intent,
-                "response": response,
-                "message": message
-            }
+            while True:
+                item = await queues[-1].get()
+                if item is _PIPELINE_DONE:
+                    break
+                yield item["result"]
             
+            # Surface errors raised by the message source
+            await feeder
+        finally:
+            for task in [feeder, *workers]:
+                task.cancel()
+    
+    def _pipeline_stages(self):
+        """Stages of message processing, in order"""
+        return [self._stage_classify, self._stage_generate, self._stage_safety, self._stage_send]
+    
+    async def _run_stage(self, stage, item: Dict[str, Any], platform: str):
+        """Run one stage on an item, turning failures into an error result"""
+        try:
+            await stage(item, platform)
         except Exception as e:
             logger.error(f"Message processing failed: {e}")
-            return {
+            item["result"] = {
                 "action": "error",
                 "error": str(e),
+                "message": item["message"]
+            }
+    
+    async def _stage_classify(self, item: Dict[str, Any], platform: str):
+        """Classify intent and decide whether to reply automatically"""
+        message = item["message"]
+        
+        # Classify intent and scan the context and sender for tone
+        item["intent"] = await self.intent_classifier.classify_intent(message)
+        item["context_tone"] = self.tone_matcher.scan_context(message.get("context", ""), message.get("sender", ""))
+        
+        # Check if auto-reply is enabled
+        if not self.auto_reply_enabled:
+            item["result"] = {
+                "action": "manual_review",
+                "reason": "Auto-reply disabled",
+                "intent": item["intent"],
+                "message": message
+            }
+    
+    async def _stage_generate(self, item: Dict[str, Any], platform: str):
+        """Generate the response"""
+        item["response"] = await self._generate_response(
+            item["message"], item["intent"], platform, item["context_tone"]
+        )
+    
+    async def _stage_safety(self, item: Dict[str, Any], platform: str):
+        """Hold back responses that fail the safety check"""
+        if not self.safety_monitor:
+            return
+        
+        safety_check = await self.safety_monitor.check_response(item["response"], item["message"])
+        if not safety_check["safe"]:
+            item["result"] = {
+                "action": "manual_review",
+                "reason": f"Safety concern: {safety_check['reason']}",
+                "intent": item["intent"],
+                "response": item["response"],
+                "message": item["message"]
+            }
+    
+    async def _stage_send(self, item: Dict[str, Any], platform: str):
+        """Send and log the response unless manual approval is required"""
+        message, intent, response = item["message"], item["intent"], item["response"]
+        
+        # Check if override is required
+        if self.override_required:
+            item["result"] = {
+                "action": "manual_approval",
+                "intent": intent,
+                "response": response,
                 "message": message
             }
+            return
+        
+        # Send response
+        await self._send_response(response, platform, message)
+        
+        # Log response
+        self._log_response(message, response, intent, platform)
+        
+        item["result"] = {
+            "action": "sent",
+            "intent": intent,
+            "response": response,
+            "message": message
+        }
     
     async def _generate_response(self, 
                                message: Dict[str, Any], 
                                intent: Dict[str, Any], 
-                               platform: str) -> str:
+                               platform: str,
+                               context_tone: Optional[str] = None) -> str:
         """Generate a response based on message and intent"""
         
         if not self.personality_engine:
@@ -118,7 +245,26 @@ class ResponseGenerator:
         context = message.get("context", "")
         
         # Determine appropriate tone based on intent and context
-        tone = await self.tone_matcher.determine_tone(intent, context, sender)
+        if context_tone is None:
+            context_tone = self.tone_matcher.scan_context(context, sender)
+        tone = self.tone_matcher.combine_tone(intent, context_tone)
+        
+        # Repeated messages reuse the final response for the same model
+        if self._response_cache_version != self.personality_engine.model_version:
+            self._response_cache.clear()
+            self._response_cache_version = self.personality_engine.model_version
+        
+        normalized = " ".join(content.lower().split())
+        cache_key = (
+            intent.get("type", "unknown"),
+            tone,
+            self.current_mood,
+            hashlib.sha1(f"{context}\x00{normalized}".encode("utf-8")).hexdigest()
+        )
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            return cached
         
         # Generate response using personality engine
         response = await self.personality_engine.generate_response(
@@ -128,7 +274,13 @@ class ResponseGenerator:
         )
         
         # Apply tone adjustments
-        adjusted_response = await self.tone_matcher.apply_tone(response, tone)
+        adjusted_response = self.tone_matcher.apply_tone(response, tone)
+        
+        # Canned replies (untrained model, API failure) are not worth keeping
+        if not self.personality_engine.is_canned_response(response):
+            self._response_cache[cache_key] = adjusted_response
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
         
         return adjusted_response
     
@@ -152,21 +304,47 @@ class ResponseGenerator:
                      platform: str):
         """Log the response for analysis and improvement"""
         
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "platform": platform,
-            "original_message": original_message,
-            "response": response,
-            "intent": intent,
-            "mood": self.current_mood,
-            "auto_reply": self.auto_reply_enabled
-        }
+        log_entry = ResponseLogEntry(
+            timestamp=time.time(),
+            platform=platform,
+            message_id=original_message.get("id"),
+            sender=original_message.get("sender", ""),
+            response=response,
+            intent=intent,
+            mood=self.current_mood,
+            auto_reply=self.auto_reply_enabled
+        )
+        
+        # Retire the entry the deque is about to evict from the statistics
+        if len(self.response_history) == self.response_history.maxlen:
+            self._count_entry(self.response_history[0], -1)
         
         self.response_history.append(log_entry)
+        self._count_entry(log_entry, 1)
         
-        # Keep only last 1000 responses
-        if len(self.response_history) > 1000:
-            self.response_history = self.response_history[-1000:]
+        if self._log_fd is not None:
+            try:
+                _LOG_ENCODER.encode_into(log_entry, self._log_buffer)
+                self._log_buffer.extend(b"\n")
+                os.write(self._log_fd, self._log_buffer)
+            except Exception as e:
+                logger.error(f"Failed to write response log: {e}")
+    
+    def _count_entry(self, entry: ResponseLogEntry, delta: int):
+        """Add (delta=1) or remove (delta=-1) a history entry from the running statistics"""
+        for counts, key in ((self._platform_counts, entry.platform),
+                            (self._intent_counts, entry.intent.get("type", "unknown")),
+                            (self._mood_counts, entry.mood)):
+            counts[key] += delta
+            if not counts[key]:
+                del counts[key]
+        self._auto_reply_count += delta * entry.auto_reply
+    
+    def close(self):
+        """Close the response log, if one is open"""
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
     
     def enable_auto_reply(self, enabled: bool = True):
         """Enable or disable automatic responses"""
@@ -190,38 +368,28 @@ class ResponseGenerator:
     
     def get_response_stats(self) -> Dict[str, Any]:
         """Get statistics about generated responses"""
-        if not self.response_history:
-            return {"total_responses": 0}
-        
         total = len(self.response_history)
-        platforms = {}
-        intents = {}
-        moods = {}
-        
-        for entry in self.response_history:
-            # Platform stats
-            platform = entry.get("platform", "unknown")
-            platforms[platform] = platforms.get(platform, 0) + 1
-            
-            # Intent stats
-            intent_type = entry.get("intent", {}).get("type", "unknown")
-            intents[intent_type] = intents.get(intent_type, 0) + 1
-            
-            # Mood stats
-            mood = entry.get("mood", "default")
-            moods[mood] = moods.get(mood, 0) + 1
+        if not total:
+            return {"total_responses": 0}
         
         return {
             "total_responses": total,
-            "platforms": platforms,
-            "intents": intents,
-            "moods": moods,
-            "auto_reply_rate": sum(1 for e in self.response_history if e.get("auto_reply", False)) / total
+            "platforms": dict(self._platform_counts),
+            "intents": dict(self._intent_counts),
+            "moods": dict(self._mood_counts),
+            "auto_reply_rate": self._auto_reply_count / total
         }
     
     def get_recent_responses(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent response history"""
-        return self.response_history[-limit:]
+        # Timestamps are stored as epoch seconds and formatted on read
+        history = self.response_history
+        # Same window as history[-limit:], without copying the deque
+        start = max(0, len(history) - limit) if limit > 0 else min(len(history), -limit)
+        return [
+            {**msgspec.structs.asdict(entry), "timestamp": datetime.fromtimestamp(entry.timestamp).isoformat()}
+            for entry in islice(history, start, None)
+        ]
     
     async def generate_test_response(self, 
                                    test_input: str, 
@@ -246,5 +414,9 @@ class ResponseGenerator:
     
     def clear_history(self):
         """Clear response history"""
-        self.response_history = []
+        self.response_history.clear()
+        self._platform_counts.clear()
+        self._intent_counts.clear()
+        self._mood_counts.clear()
+        self._auto_reply_count = 0
         logger.info("🗑️ Response history cleared") 
\ No newline at end of file
@@ -9,6 +9,46 @@ import re
 
 logger = logging.getLogger(__name__)
 
+_LOL_RE = re.compile(r"\blol\b", re.IGNORECASE)
+_SPACE_RUN_RE = re.compile(r"[ \t]{2,}")
+_WARMTH_EMOJI_RE = re.compile("😊|❤️|👍")
+
+def _make_formal(response: str) -> str:
+    """Add formality"""
+    if response.startswith(("Dear", "Hello", "Hi")):
+        return response
+    return f"Hello, {response}"
+
+def _make_casual(response: str) -> str:
+    """Make more casual"""
+    return response.replace("Hello", "Hey").replace("Thank you", "Thanks")
+
+def _make_professional(response: str) -> str:
+    """Make more professional"""
+    # Removing a word leaves its surrounding spaces behind
+    return _SPACE_RUN_RE.sub(" ", _LOL_RE.sub("", response)).strip()
+
+def _make_friendly(response: str) -> str:
+    """Add warmth"""
+    if _WARMTH_EMOJI_RE.search(response):
+        return response
+    return response + " 😊"
+
+def _make_urgent(response: str) -> str:
+    """Make more urgent"""
+    if "!" in response:
+        return response
+    return response + "!"
+
+# Transform for each adjustment name, in the order apply_tone tries them
+_ADJUSTMENT_TRANSFORMS = {
+    "formal": _make_formal,
+    "casual": _make_casual,
+    "professional": _make_professional,
+    "friendly": _make_friendly,
+    "urgent": _make_urgent
+}
+
 class ToneMatcher:
     """Matches and adjusts response tone based on context"""
     
@@ -36,89 +76,76 @@ class ToneMatcher:
             }
         }
         
-    async def determine_tone(self, 
-                           intent: Dict[str, Any], 
-                           context: str, 
-                           sender: str) -> str:
+        # A tone is transformed by the first of its adjustments that names a
+        # transform. None of the configured adjustments do yet, so every tone
+        # currently leaves the response unchanged
+        self._tone_transforms = {}
+        for tone, config in self.tone_patterns.items():
+            for name, transform in _ADJUSTMENT_TRANSFORMS.items():
+                if name in config["adjustments"]:
+                    self._tone_transforms[tone] = transform
+                    break
+        
+        # Lookup tables for determine_tone, later rules overriding earlier ones
+        self._intent_tone = {
+            "greeting": "friendly",
+            "question": "helpful",
+            "request": "professional",
+            "complaint": "empathetic",
+            "urgent": "urgent",
+            "casual": "casual"
+        }
+        self._context_keywords = {
+            "work": "professional",
+            "business": "professional",
+            "friend": "friendly",
+            "family": "friendly"
+        }
+        self._sender_tone = {
+            "boss": "professional",
+            "manager": "professional",
+            "supervisor": "professional",
+            "friend": "casual",
+            "family": "casual",
+            "close": "casual"
+        }
+        
+    def determine_tone(self, 
+                     intent: Dict[str, Any], 
+                     context: str, 
+                     sender: str) -> str:
         """Determine appropriate tone based on intent and context"""
+        return self.combine_tone(intent, self.scan_context(context, sender))
+    
+    def scan_context(self, context: str, sender: str) -> Optional[str]:
+        """Tone implied by the context and sender alone, independent of intent"""
         try:
-            # Analyze intent
-            intent_type = intent.get("type", "unknown")
-            intent_context = intent.get("context", {})
-            
-            # Default tone
-            tone = "neutral"
-            
-            # Adjust based on intent
-            if intent_type == "greeting":
-                tone = "friendly"
-            elif intent_type == "question":
-                tone = "helpful"
-            elif intent_type == "request":
-                tone = "professional"
-            elif intent_type == "complaint":
-                tone = "empathetic"
-            elif intent_type == "urgent":
-                tone = "urgent"
-            elif intent_type == "casual":
-                tone = "casual"
-            
             # Adjust based on context
-            if "work" in context.lower() or "business" in context.lower():
-                tone = "professional"
-            elif "friend" in context.lower() or "family" in context.lower():
-                tone = "friendly"
+            tone = None
+            context_lower = context.lower()
+            for keyword, context_tone in self._context_keywords.items():
+                if keyword in context_lower:
+                    tone = context_tone
+                    break
             
             # Adjust based on sender relationship
-            if sender in ["boss", "manager", "supervisor"]:
-                tone = "professional"
-            elif sender in ["friend", "family", "close"]:
-                tone = "casual"
-            
-            return tone
+            return self._sender_tone.get(sender, tone)
             
         except Exception as e:
             logger.error(f"Tone determination failed: {e}")
-            return "neutral"
+            return None
     
-    async def apply_tone(self, response: str, tone: str) -> str:
+    def combine_tone(self, intent: Dict[str, Any], context_tone: Optional[str]) -> str:
+        """Final tone: the context/sender tone if any, otherwise the intent's (neutral by default)"""
+        if context_tone:
+            return context_tone
+        return self._intent_tone.get(intent.get("type", "unknown"), "neutral")
+    
+    def apply_tone(self, response: str, tone: str) -> str:
         """Apply tone adjustments to a response"""
         try:
-            if tone == "neutral":
-                return response
-            
-            # Get tone adjustments
-            tone_config = self.tone_patterns.get(tone, {})
-            adjustments = tone_config.get("adjustments", [])
-            
-            # Apply adjustments (simplified for now)
-            adjusted_response = response
-            
-            if "formal" in adjustments:
-                # Add formality
-                if not response.startswith(("Dear", "Hello", "Hi")):
-                    adjusted_response = f"Hello, {response}"
-            
-            elif "casual" in adjustments:
-                # Make more casual
-                adjusted_response = response.replace("Hello", "Hey").replace("Thank you", "Thanks")
-            
-            elif "professional" in adjustments:
-                # Make more professional
-                if "lol" in adjusted_response.lower():
-                    adjusted_response = adjusted_response.replace("lol", "").replace("LOL", "")
-            
-            elif "friendly" in adjustments:
-                # Add warmth
-                if not any(emoji in adjusted_response for emoji in ["😊", "❤️", "👍"]):
-                    adjusted_response += " 😊"
-            
-            elif "urgent" in adjustments:
-                # Make more urgent
-                if "!" not in adjusted_response:
-                    adjusted_response += "!"
-            
-            return adjusted_response
+            transform = self._tone_transforms.get(tone)
+            return transform(response) if transform else response
             
         except Exception as e:
             logger.error(f"Tone application failed: {e}")
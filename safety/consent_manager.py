@@ -3,12 +3,21 @@ Consent Manager
 Manages user consent for AI interactions
 """
 
+import time
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+import msgspec
 
 logger = logging.getLogger(__name__)
 
+class ConsentRecord(msgspec.Struct):
+    """A consent grant or revocation in the consent history"""
+    timestamp: float
+    sender: str
+    action: str
+    platform: str = ""
+
 class ConsentManager:
     """Manages user consent for AI interactions"""
     
@@ -16,7 +25,10 @@ class ConsentManager:
         self.consented_contacts = set()
         self.consent_history = []
         
-    async def check_consent(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        # Platforms where contacting us implies consent
+        self._auto_consent_platforms = frozenset({"discord", "email", "slack"})
+        
+    def check_consent(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Check if we have consent to respond to this sender"""
         try:
             sender = message.get("sender", "")
@@ -38,7 +50,7 @@ class ConsentManager:
             
             # For now, assume consent for known platforms
             # In a real implementation, you'd have more sophisticated consent management
-            if platform in ["discord", "email", "slack"]:
+            if platform in self._auto_consent_platforms:
                 return {
                     "consented": True,
                     "reason": "Platform-based consent"
@@ -60,12 +72,12 @@ class ConsentManager:
         """Add consent for a sender"""
         self.consented_contacts.add(sender)
         
-        consent_record = {
-            "timestamp": datetime.now().isoformat(),
-            "sender": sender,
-            "platform": platform,
-            "action": "consent_granted"
-        }
+        consent_record = ConsentRecord(
+            timestamp=time.time(),
+            sender=sender,
+            platform=platform,
+            action="consent_granted"
+        )
         
         self.consent_history.append(consent_record)
         logger.info(f"✅ Consent added for {sender}")
@@ -74,11 +86,11 @@ class ConsentManager:
         """Remove consent for a sender"""
         self.consented_contacts.discard(sender)
         
-        consent_record = {
-            "timestamp": datetime.now().isoformat(),
-            "sender": sender,
-            "action": "consent_revoked"
-        }
+        consent_record = ConsentRecord(
+            timestamp=time.time(),
+            sender=sender,
+            action="consent_revoked"
+        )
         
         self.consent_history.append(consent_record)
         logger.info(f"❌ Consent removed for {sender}")
@@ -89,4 +101,8 @@ class ConsentManager:
     
     def get_consent_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get consent history"""
-        return self.consent_history[-limit:] 
\ No newline at end of file
+        # Timestamps are stored as epoch seconds and formatted on read
+        return [
+            {**msgspec.structs.asdict(record), "timestamp": datetime.fromtimestamp(record.timestamp).isoformat()}
+            for record in self.consent_history[-limit:]
+        ] 
\ No newline at end of file
@@ -5,10 +5,14 @@ Filters inappropriate or harmful content
 
 import logging
 from typing import Dict, List, Optional, Any
-import re
+from collections import OrderedDict
+import ahocorasick
 
 logger = logging.getLogger(__name__)
 
+# Number of check results kept for content that repeats verbatim
+CONTENT_CACHE_SIZE = 4096
+
 class ContentFilter:
     """Filters inappropriate or harmful content"""
     
@@ -28,32 +32,59 @@ class ContentFilter:
             r"violence", r"murder", r"assault"
         ]
         
-    async def check_content(self, content: str) -> Dict[str, Any]:
+        # Every pattern is a literal phrase, so one Aho-Corasick automaton
+        # finds all of them in a single pass over the lowercased content
+        self._automaton = ahocorasick.Automaton()
+        for category, patterns in (("harmful", self.harmful_patterns), ("inappropriate", self.inappropriate_patterns)):
+            for order, pattern in enumerate(patterns):
+                self._automaton.add_word(pattern.lower(), (category, order, pattern))
+        self._automaton.make_automaton()
+        
+        # Content shorter than every pattern cannot match any of them
+        self._min_pattern_length = min(map(len, self.harmful_patterns + self.inappropriate_patterns))
+        
+        # The patterns never change, so results for repeated content
+        # (cached or canned replies) stay valid
+        self._result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+    def check_content(self, content: str) -> Dict[str, Any]:
         """Check if content is appropriate"""
         try:
-            content_lower = content.lower()
+            if len(content) < self._min_pattern_length:
+                return {
+                    "safe": True,
+                    "reason": "",
+                    "harmful_patterns": [],
+                    "inappropriate_patterns": []
+                }
             
-            # Check for harmful content
-            harmful_found = []
-            for pattern in self.harmful_patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    harmful_found.append(pattern)
+            cached = self._result_cache.get(content)
+            if cached is not None:
+                self._result_cache.move_to_end(content)
+                return cached
             
-            # Check for inappropriate content
-            inappropriate_found = []
-            for pattern in self.inappropriate_patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    inappropriate_found.append(pattern)
+            # Check for harmful and inappropriate content
+            found = {"harmful": set(), "inappropriate": set()}
+            for _, (category, order, pattern) in self._automaton.iter(content.lower()):
+                found[category].add((order, pattern))
+            
+            harmful_found = [pattern for _, pattern in sorted(found["harmful"])]
+            inappropriate_found = [pattern for _, pattern in sorted(found["inappropriate"])]
             
             # Determine if content is safe
             is_safe = len(harmful_found) == 0 and len(inappropriate_found) == 0
             
-            return {
+            result = {
                 "safe": is_safe,
                 "reason": self._get_reason(harmful_found, inappropriate_found),
                 "harmful_patterns": harmful_found,
                 "inappropriate_patterns": inappropriate_found
             }
+            self._result_cache[content] = result
+            if len(self._result_cache) > CONTENT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+            
+            return result
             
         except Exception as e:
             logger.error(f"Content filtering failed: {e}")
@@ -3,16 +3,93 @@ Safety Monitor
 Ensures ethical and safe AI behavior
 """
 
-import logging
+import os
 import re
-from typing import Dict, List, Optional, Any
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from datetime import datetime
+from collections import Counter, deque
+from itertools import islice
+import ahocorasick
+import msgspec
 
 from .content_filter import ContentFilter
 from .consent_manager import ConsentManager
 
 logger = logging.getLogger(__name__)
 
+# Number of safety events kept in memory
+SAFETY_HISTORY_SIZE = 1000
+
+# Accepted values for the safety mode
+SAFETY_MODES = frozenset({"strict", "moderate", "lenient"})
+
+# Personal information patterns (SSN, credit card, phone number, email),
+# fused into one alternation so each response is scanned once
+_PII_RE = re.compile(
+    r'(?:\b\d{3}-\d{2}-\d{4}\b)'
+    r'|(?:\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b)'
+    r'|(?:\b\d{3}[\s-]?\d{3}[\s-]?\d{4}\b)'
+    r'|(?:\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+)
+
+# Every PII pattern needs a digit or an "@", so a cheap character scan
+# rules most responses out before the full alternation runs
+_PII_HINT_RE = re.compile(r'[\d@]')
+
+# Words of three or more capital letters read as shouting
+_CAPS_WORD_RE = re.compile(r'\b[A-Z]{3,}\b')
+
+# High-risk phrases that could damage relationships
+RISK_PHRASES = (
+    "i hate you", "you're stupid", "you're wrong", "i don't care",
+    "whatever", "i don't want to talk to you", "leave me alone",
+    "you're annoying", "i'm done with you", "goodbye forever"
+)
+
+# Default redlines - things the AI should never say
+DEFAULT_REDLINES = frozenset({
+    "passwords", "credit cards", "social security", "bank account",
+    "personal address", "phone number", "family secrets",
+    "confidential information", "trade secrets", "private keys"
+})
+
+# Sensitive topics that require extra caution
+DEFAULT_SENSITIVE_TOPICS = frozenset({
+    "politics", "religion", "money", "health", "relationships",
+    "work conflicts", "legal issues", "family problems"
+})
+
+def _build_automaton(phrases) -> ahocorasick.Automaton:
+    """Compile phrases into an Aho-Corasick automaton that yields the matched phrase"""
+    automaton = ahocorasick.Automaton()
+    for phrase in phrases:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
+# Each automaton finds any of its phrases in a single pass over the response.
+# They are never mutated once built, so every monitor shares these
+_RISK_AUTOMATON = _build_automaton(RISK_PHRASES)
+_DEFAULT_REDLINE_AUTOMATON = _build_automaton(DEFAULT_REDLINES)
+
+class SafetyEvent(msgspec.Struct):
+    """A safety check as recorded in the safety history"""
+    timestamp: float
+    response: str
+    original_message: str
+    sender: str
+    platform: str
+    safe: bool
+    reason: str
+    flags: Tuple[str, ...]
+
+def _truncate(text: str, limit: int) -> str:
+    """Shorten text to limit characters, marking the cut with an ellipsis"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
 class SafetyMonitor:
     """Monitors AI behavior for safety and ethical concerns"""
     
@@ -22,11 +99,23 @@ class SafetyMonitor:
         
         # Safety settings
         self.safety_mode = "strict"  # strict, moderate, lenient
-        self.redlines = set()
-        self.sensitive_topics = set()
+        self.redlines = frozenset()
+        self.sensitive_topics = frozenset()
+        self._redline_automaton = ahocorasick.Automaton()
         
         # Safety history
-        self.safety_events = []
+        self.safety_events = deque(maxlen=SAFETY_HISTORY_SIZE)
+        
+        # Running statistics over the events currently in the history
+        self._flag_counts = Counter()
+        self._platform_counts = Counter()
+        self._unsafe_count = 0
+        
+        # Unsafe-event warnings are batched into one log record per flush
+        self.batch_size = int(os.getenv("SAFETY_BATCH_SIZE", "64"))
+        self.batch_ms = int(os.getenv("SAFETY_BATCH_MS", "50"))
+        self._pending_warnings = []
+        self._flush_handle = None
         
         # Load default safety settings
         self._load_default_settings()
@@ -36,18 +125,15 @@ class SafetyMonitor:
     def _load_default_settings(self):
         """Load default safety settings"""
         
-        # Default redlines - things the AI should never say
-        self.redlines = {
-            "passwords", "credit cards", "social security", "bank account",
-            "personal address", "phone number", "family secrets",
-            "confidential information", "trade secrets", "private keys"
-        }
-        
-        # Sensitive topics that require extra caution
-        self.sensitive_topics = {
-            "politics", "religion", "money", "health", "relationships",
-            "work conflicts", "legal issues", "family problems"
-        }
+        # Both sets are frozen and replaced on change, so the redline
+        # automaton always matches the set it was built from
+        self.redlines = DEFAULT_REDLINES
+        self.sensitive_topics = DEFAULT_SENSITIVE_TOPICS
+        self._redline_automaton = _DEFAULT_REDLINE_AUTOMATON
+    
+    def _build_redline_automaton(self):
+        """Compile the redline terms into a single Aho-Corasick automaton"""
+        self._redline_automaton = _build_automaton(self.redlines)
     
     async def check_response(self, 
                            response: str, 
@@ -62,33 +148,14 @@ class SafetyMonitor:
                 "flags": []
             }
             
-            # Check for redlines
-            redline_check = self._check_redlines(response)
-            if not redline_check["safe"]:
-                safety_result["safe"] = False
-                safety_result["reason"] = f"Redline violation: {redline_check['reason']}"
-                safety_result["flags"].append("redline")
-            
-            # Check content filter
-            content_check = await self.content_filter.check_content(response)
-            if not content_check["safe"]:
-                safety_result["safe"] = False
-                safety_result["reason"] = f"Content filter: {content_check['reason']}"
-                safety_result["flags"].append("content")
-            
-            # Check consent
-            consent_check = await self.consent_manager.check_consent(original_message)
-            if not consent_check["consented"]:
+            for flag, reason in self._failed_checks(response, original_message):
                 safety_result["safe"] = False
-                safety_result["reason"] = f"Consent issue: {consent_check['reason']}"
-                safety_result["flags"].append("consent")
-            
-            # Check for relationship risks
-            relationship_check = self._check_relationship_risks(response, original_message)
-            if not relationship_check["safe"]:
-                safety_result["safe"] = False
-                safety_result["reason"] = f"Relationship risk: {relationship_check['reason']}"
-                safety_result["flags"].append("relationship")
+                safety_result["reason"] = reason
+                safety_result["flags"].append(flag)
+                
+                # Strict mode only needs to know that the response is unsafe
+                if self.safety_mode == "strict":
+                    break
             
             # Log safety event
             self._log_safety_event(response, original_message, safety_result)
@@ -104,64 +171,72 @@ class SafetyMonitor:
                 "flags": ["error"]
             }
     
-    def _check_redlines(self, response: str) -> Dict[str, Any]:
-        """Check if response violates any redlines"""
+    def _failed_checks(self, 
+                       response: str, 
+                       original_message: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+        """Run the safety checks cheapest first, yielding (flag, reason) for each failure"""
+        
+        # Check consent
+        consent_check = self.consent_manager.check_consent(original_message)
+        if not consent_check["consented"]:
+            yield "consent", f"Consent issue: {consent_check['reason']}"
         
+        # Both phrase scans match against the same lowercased copy
         response_lower = response.lower()
         
-        for redline in self.redlines:
-            if redline in response_lower:
-                return {
-                    "safe": False,
-                    "reason": f"Contains redline term: {redline}"
-                }
+        # Check for redlines
+        redline_check = self._check_redlines(response, response_lower)
+        if not redline_check["safe"]:
+            yield "redline", f"Redline violation: {redline_check['reason']}"
         
-        # Check for potential personal information patterns
-        patterns = [
-            r'\b\d{3}-\d{2}-\d{4}\b',  # SSN pattern
-            r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',  # Credit card
-            r'\b\d{3}[\s-]?\d{3}[\s-]?\d{4}\b',  # Phone number
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'  # Email
-        ]
+        # Check for relationship risks
+        relationship_check = self._check_relationship_risks(response, response_lower, original_message)
+        if not relationship_check["safe"]:
+            yield "relationship", f"Relationship risk: {relationship_check['reason']}"
+        
+        # Check content filter
+        content_check = self.content_filter.check_content(response)
+        if not content_check["safe"]:
+            yield "content", f"Content filter: {content_check['reason']}"
+    
+    def _check_redlines(self, response: str, response_lower: str) -> Dict[str, Any]:
+        """Check if response violates any redlines"""
         
-        for pattern in patterns:
-            if re.search(pattern, response):
+        # An automaton with no terms cannot be searched
+        if self._redline_automaton.kind != ahocorasick.EMPTY:
+            # Leftmost-longest match, so "bank account" wins over a shorter
+            # redline it contains
+            match = next(self._redline_automaton.iter_long(response_lower), None)
+            if match is not None:
                 return {
                     "safe": False,
-                    "reason": "Contains potential personal information"
+                    "reason": f"Contains redline term: {match[1]}"
                 }
         
+        # Check for potential personal information patterns
+        if _PII_HINT_RE.search(response) and _PII_RE.search(response):
+            return {
+                "safe": False,
+                "reason": "Contains potential personal information"
+            }
+        
         return {"safe": True, "reason": ""}
     
     def _check_relationship_risks(self, 
                                 response: str, 
+                                response_lower: str, 
                                 original_message: Dict[str, Any]) -> Dict[str, Any]:
         """Check for potential relationship-damaging content"""
         
-        # High-risk phrases that could damage relationships
-        risk_phrases = [
-            "i hate you", "you're stupid", "you're wrong", "i don't care",
-            "whatever", "i don't want to talk to you", "leave me alone",
-            "you're annoying", "i'm done with you", "goodbye forever"
-        ]
-        
-        response_lower = response.lower()
-        
-        for phrase in risk_phrases:
-            if phrase in response_lower:
-                return {
-                    "safe": False,
-                    "reason": f"Contains relationship risk phrase: {phrase}"
-                }
-        
-        # Check for overly aggressive tone
-        aggressive_indicators = [
-            response.count('!') > 3,  # Too many exclamations
-            response.count('CAPS') > 0,  # ALL CAPS
-            len(re.findall(r'\b[A-Z]{3,}\b', response)) > 0  # Multiple caps words
-        ]
+        match = next(_RISK_AUTOMATON.iter(response_lower), None)
+        if match is not None:
+            return {
+                "safe": False,
+                "reason": f"Contains relationship risk phrase: {match[1]}"
+            }
         
-        if any(aggressive_indicators):
+        # Check for overly aggressive tone: too many exclamations or caps words
+        if response.count('!') > 3 or _CAPS_WORD_RE.search(response):
             return {
                 "safe": False,
                 "reason": "Aggressive tone detected"
@@ -175,46 +250,82 @@ class SafetyMonitor:
                          safety_result: Dict[str, Any]):
         """Log safety events for monitoring"""
         
-        event = {
-            "timestamp": datetime.now().isoformat(),
-            "response": response[:200] + "..." if len(response) > 200 else response,
-            "original_message": original_message.get("content", "")[:100] + "..." if len(original_message.get("content", "")) > 100 else original_message.get("content", ""),
-            "sender": original_message.get("sender", "unknown"),
-            "platform": original_message.get("platform", "unknown"),
-            "safe": safety_result["safe"],
-            "reason": safety_result["reason"],
-            "flags": safety_result["flags"]
-        }
+        event = SafetyEvent(
+            timestamp=time.time(),
+            response=_truncate(response, 200),
+            original_message=_truncate(original_message.get("content", ""), 100),
+            sender=original_message.get("sender", "unknown"),
+            platform=original_message.get("platform", "unknown"),
+            safe=safety_result["safe"],
+            reason=safety_result["reason"],
+            flags=tuple(safety_result["flags"])
+        )
         
-        self.safety_events.append(event)
+        # Retire the event the deque is about to evict from the statistics
+        if len(self.safety_events) == self.safety_events.maxlen:
+            self._count_event(self.safety_events[0], -1)
         
-        # Keep only last 1000 events
-        if len(self.safety_events) > 1000:
-            self.safety_events = self.safety_events[-1000:]
+        self.safety_events.append(event)
+        self._count_event(event, 1)
         
         # Log to file if safety issue
         if not safety_result["safe"]:
-            logger.warning(f"🚨 Safety issue: {safety_result['reason']}")
+            self._queue_warning(f"🚨 Safety issue: {safety_result['reason']}")
+    
+    def _count_event(self, event: SafetyEvent, delta: int):
+        """Add (delta=1) or remove (delta=-1) an event from the running statistics"""
+        keys = [(self._flag_counts, flag) for flag in event.flags]
+        keys.append((self._platform_counts, event.platform))
+        for counts, key in keys:
+            counts[key] += delta
+            if not counts[key]:
+                del counts[key]
+        if not event.safe:
+            self._unsafe_count += delta
+    
+    def _queue_warning(self, message: str):
+        """Queue a safety warning, flushing once the batch fills or times out"""
+        self._pending_warnings.append(message)
+        if len(self._pending_warnings) >= self.batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to schedule the flush on
+                self.flush()
+                return
+            self._flush_handle = loop.call_later(self.batch_ms / 1000, self.flush)
+    
+    def flush(self):
+        """Write any pending safety warnings as a single log record"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending_warnings:
+            pending, self._pending_warnings = self._pending_warnings, []
+            logger.warning("\n".join(pending))
     
     def add_redline(self, term: str):
         """Add a new redline term"""
-        self.redlines.add(term.lower())
+        self.redlines = self.redlines | {term.lower()}
+        self._build_redline_automaton()
         logger.info(f"🔴 Added redline: {term}")
     
     def remove_redline(self, term: str):
         """Remove a redline term"""
-        self.redlines.discard(term.lower())
+        self.redlines = self.redlines - {term.lower()}
+        self._build_redline_automaton()
         logger.info(f"🟢 Removed redline: {term}")
     
     def add_sensitive_topic(self, topic: str):
         """Add a sensitive topic"""
-        self.sensitive_topics.add(topic.lower())
+        self.sensitive_topics = self.sensitive_topics | {topic.lower()}
         logger.info(f"⚠️ Added sensitive topic: {topic}")
     
     def set_safety_mode(self, mode: str):
         """Set safety mode (strict, moderate, lenient)"""
-        valid_modes = ["strict", "moderate", "lenient"]
-        if mode in valid_modes:
+        if mode in SAFETY_MODES:
             self.safety_mode = mode
             logger.info(f"🛡️ Safety mode set to: {mode}")
         else:
@@ -226,26 +337,14 @@ class SafetyMonitor:
             return {"total_events": 0}
         
         total_events = len(self.safety_events)
-        unsafe_events = sum(1 for event in self.safety_events if not event["safe"])
-        
-        # Flag breakdown
-        flag_counts = {}
-        for event in self.safety_events:
-            for flag in event.get("flags", []):
-                flag_counts[flag] = flag_counts.get(flag, 0) + 1
-        
-        # Platform breakdown
-        platform_counts = {}
-        for event in self.safety_events:
-            platform = event.get("platform", "unknown")
-            platform_counts[platform] = platform_counts.get(platform, 0) + 1
+        unsafe_events = self._unsafe_count
         
         return {
             "total_events": total_events,
             "unsafe_events": unsafe_events,
             "safety_rate": (total_events - unsafe_events) / total_events if total_events > 0 else 1.0,
-            "flag_breakdown": flag_counts,
-            "platform_breakdown": platform_counts,
+            "flag_breakdown": dict(self._flag_counts),
+            "platform_breakdown": dict(self._platform_counts),
             "current_mode": self.safety_mode,
             "redlines_count": len(self.redlines),
             "sensitive_topics_count": len(self.sensitive_topics)
@@ -253,7 +352,14 @@ class SafetyMonitor:
     
     def get_recent_safety_events(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent safety events"""
-        return self.safety_events[-limit:]
+        # Timestamps are stored as epoch seconds and formatted on read
+        events = self.safety_events
+        # Same window as events[-limit:], without copying the deque
+        start = max(0, len(events) - limit) if limit > 0 else min(len(events), -limit)
+        return [
+            {**msgspec.structs.asdict(event), "timestamp": datetime.fromtimestamp(event.timestamp).isoformat()}
+            for event in islice(events, start, None)
+        ]
     
     def get_mode(self) -> str:
         """Get current safety mode"""
@@ -261,5 +367,8 @@ class SafetyMonitor:
     
     def clear_safety_history(self):
         """Clear safety event history"""
-        self.safety_events = []
+        self.safety_events.clear()
+        self._flag_counts.clear()
+        self._platform_counts.clear()
+        self._unsafe_count = 0
         logger.info("🗑️ Safety history cleared") 
\ No newline at end of file